@@ -2,6 +2,7 @@ import Rhino
 import scriptcontext
 import Rhino.Geometry as rg
 import rhinoscriptsyntax as rs
+from helpers import profiling
 
 surface_planes = []
 surface_outline = []
@@ -81,13 +82,27 @@ def usertext(neighbours_dict, surfaces_dict, surfaces_list):
                 edge_neighbour,
                 str(
                     neighbours_dict[surface_index][
-                        neighbours_dic[surface_index].keys()[neighbour_index]
+                        neighbours_dict[surface_index].keys()[neighbour_index]
                     ]
                 ),
             )
             print(text)
 
 
+@profiling.stage("neighborhood")
+def establish_neighborhood(surfaces):
+    """
+    Stores panel indices and edge neighbors as user text on the given surfaces
+    """
+    surfaces_dic = dictionaries(surfaces)
+    neighbours_dic = neighbours(surfaces_dic)
+    usertext(neighbours_dic, surfaces_dic, surfaces)
+
+    # the duplicated edge curves are only needed for the neighbor search
+    for edges in surfaces_dic.values():
+        rs.DeleteObjects(edges)
+
+
 if __name__ == "__main__":
 
     surfaces = rs.GetObjects("Please select your cassetes", 0, True, False, True)
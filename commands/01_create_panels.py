@@ -1,34 +1,46 @@
 import rhinoscriptsyntax as rs
 from helpers.topology import PanelTopology
 import components.repository as repo
+from helpers import profiling
+from helpers import settings as settings_profiles
+from helpers.settings import GeometrySettings
+
+DEFAULT_SETTINGS = GeometrySettings(
+    beam_max_width=60,
+    beam_thickness=20,
+    plate_thickness=25,
+    dowel_radius=5,
+    sawtooth_depth=15,
+    sawtooth_width=40,
+    toolhead_radius=4,
+)
+
+
+@profiling.stage("panels")
+def create_panels(picked_ids=None, settings=None):
+    if picked_ids is None:
+        # Ask to select some panels from Rhino
+        picked_ids = rs.GetObjects("Select panels", 8)
+
+    if not picked_ids:
+        return
 
-# from helpers.settings import GeometrySettings
-
+    if settings is None:
+        settings = DEFAULT_SETTINGS
 
-def create_panels():
-    # Ask to select some panels from Rhino
-    picked_ids = rs.GetObjects("Select panels", 8)
+    # fail before creating anything, if settings are missing or invalid
+    settings = GeometrySettings.from_mapping(settings)
 
-    if len(picked_ids) == 0:
-        return
+    # all panels share one settings profile, stored once in the document
+    profile_id = settings_profiles.store_profile(settings)
 
     topology = PanelTopology(picked_ids)
-    # settings = GeometrySettings(60, 20, 20, 5, 15, 40)
-    settings = {
-        "beam_max_width": 60,
-        "beam_thickness": 20,
-        "plate_thickness": 25,
-        "dowel_radius": 5,
-        "sawtooth_depth": 15,
-        "sawtooth_width": 40,
-        "toolhead_radius": 4,
-    }
 
     for panel in topology.panels():
         neighbors = topology.panel_neighbors(panel.panel_index)
         for neighbor in neighbors:
             panel.add_neighbor(neighbor)
-        panel.settings = settings
+        panel.settings = settings_profiles.profile_settings(profile_id)
 
     panel_ids = []
 
@@ -3,15 +3,17 @@ import scriptcontext as sc
 from components.panel import Panel
 from helpers.beam_layer import CassetteBeamLayer
 from helpers.settings import GeometrySettings
-from helpers import keys
+from helpers import keys, profiling
 import logging
 from bake import Baker
 import components.repository as repo
 
 
+@profiling.stage("beams")
 def create_beams(panels):
 
     for panel in panels:
+        geometry_settings = panel.geometry_settings
         layers = []
         layers.append(
             CassetteBeamLayer(
@@ -20,7 +22,7 @@ def create_beams(panels):
                 panel.outline,
                 panel.plane.ZAxis,
                 panel.neighbor_angles,
-                panel.settings,
+                geometry_settings,
             )
         )
         layers.append(
@@ -30,7 +32,7 @@ def create_beams(panels):
                 layers[0].outlines[keys.BOTTOM_OUTLINE_KEY],
                 panel.plane.ZAxis,
                 panel.neighbor_angles,
-                panel.settings,
+                geometry_settings,
             )
         )
         layers.append(
@@ -40,7 +42,7 @@ def create_beams(panels):
                 layers[1].outlines[keys.BOTTOM_OUTLINE_KEY],
                 panel.plane.ZAxis,
                 panel.neighbor_angles,
-                panel.settings,
+                geometry_settings,
             )
         )
 
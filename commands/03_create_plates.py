@@ -1,4 +1,4 @@
-from helpers import algorithms, keys
+from helpers import algorithms, keys, profiling
 from helpers.geometry import ClosedPolyline
 import rhinoscriptsyntax as rs
 import logging
@@ -10,18 +10,20 @@ import Rhino.Geometry as rg
 import components.repository as repo
 
 
+@profiling.stage("plates")
 def create_plates(panels):
 
     plates = []
 
     for panel in panels:
+        geometry_settings = panel.geometry_settings
         identifier = keys.panel_plate_identifier(panel.identifier)
         outline = ClosedPolyline(
             algorithms.draft_angle_offset(
                 panel.outline,
                 panel.plane,
                 panel.neighbor_angles,
-                panel.settings["beam_thickness"] * 3,
+                geometry_settings.beam_thickness * 3,
             )
         )
         plane = rg.Plane(panel.plane)
@@ -31,7 +33,7 @@ def create_plates(panels):
             plane,
             outline,
             panel.neighbor_angles,
-            panel.settings["plate_thickness"],
+            geometry_settings.plate_thickness,
         )
 
         repo.create_component(plate)
@@ -1,4 +1,4 @@
-from helpers import algorithms, keys
+from helpers import algorithms, keys, profiling
 from helpers.geometry import ClosedPolyline
 import rhinoscriptsyntax as rs
 import logging
@@ -11,17 +11,19 @@ import Rhino.Geometry as rg
 import components.repository as repo
 
 
+@profiling.stage("dowels")
 def create_dowels(panels):
 
     dowels = []
-    dowel_radius = panels[0].settings.get("dowel_radius")
-    dowel_height = (
-        panels[0].settings["beam_thickness"] * 3
-        + panels[0].settings["plate_thickness"] / 2
-    )
-    dowel_z_shift = panels[0].settings["plate_thickness"] / 2
 
     for panel in panels:
+        geometry_settings = panel.geometry_settings
+        dowel_radius = geometry_settings.dowel_radius
+        dowel_height = (
+            geometry_settings.beam_thickness * 3 + geometry_settings.plate_thickness / 2
+        )
+        dowel_z_shift = geometry_settings.plate_thickness / 2
+
         corner_count = panel.outline.corner_count
         edge_keys = keys.edge_keys(corner_count)
         beam_idents = [
@@ -1,5 +1,5 @@
 from components.joint import JointFactory
-from helpers import algorithms, keys
+from helpers import algorithms, keys, profiling
 from helpers.geometry import ClosedPolyline
 import rhinoscriptsyntax as rs
 import logging
@@ -11,6 +11,7 @@ import Rhino.Geometry as rg
 import components.repository as repo
 
 
+@profiling.stage("joints")
 def create_joints(panels):
     neighbor_sets = set()
     for panel in panels:
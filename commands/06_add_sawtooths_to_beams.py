@@ -1,11 +1,13 @@
 import components.repository as repo
+from helpers import profiling
 import rhinoscriptsyntax as rs
 
 
-def add_sawtooths_to_beams(joints):
+@profiling.stage("beam_sawtooths")
+def add_sawtooths_to_beams(joints, create_volumes=True):
 
     for joint in joints:
-        joint.add_joint_geometry_to_children()
+        joint.add_joint_geometry_to_children(create_volumes)
 
         print(
             "Added sawtooths to panels beams connected to joint {}".format(
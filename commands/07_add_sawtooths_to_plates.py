@@ -1,17 +1,24 @@
 import components.repository as repo
+from helpers import profiling
 import rhinoscriptsyntax as rs
 
 
-def add_sawtooths_to_plates(joints):
+@profiling.stage("plate_sawtooths")
+def add_sawtooths_to_plates(joints, create_volumes=True):
     plate_ids = set()
 
     for joint in joints:
         plate_ids.add(joint.add_joint_geometry_to_plates())
 
+    if not create_volumes:
+        # the detailed edges are serialized with the plates already
+        return
+
     for plates in plate_ids:
         for plate in plates:
             plate = repo.get_component_by_part_id(plate)
             plate.create_and_set_detail_geometry()
+            repo.mark_dirty(plate)
 
     repo.commit_changes()
 
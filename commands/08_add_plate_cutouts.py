@@ -1,4 +1,4 @@
-from helpers import algorithms, keys
+from helpers import algorithms, keys, profiling
 from helpers.geometry import ClosedPolyline
 import rhinoscriptsyntax as rs
 import logging
@@ -14,6 +14,7 @@ CUTOUT_DISTANCE = 100
 SEGMENT_DIVISIONS = 2
 
 
+@profiling.stage("cutouts")
 def add_plate_cutout(panels):
     for panel in panels:
 
@@ -53,13 +54,14 @@ def add_plate_cutout(panels):
 
         # extrude inner outline downwards (in plane z)
         negative_volume = rg.Extrusion.Create(
-            inner_outline, panel.settings.get("plate_thickness"), True
+            inner_outline, panel.geometry_settings.plate_thickness, True
         )
 
         # boolean difference from detailed plate and negative volume
-        result = rg.Brep.CreateBooleanDifference(
-            plate.detailed_volume_geometry, negative_volume.ToBrep(), 0.001
-        )
+        with profiling.measure("boolean", "plate_cutout"):
+            result = rg.Brep.CreateBooleanDifference(
+                plate.detailed_volume_geometry, negative_volume.ToBrep(), 0.001
+            )
         if result.Count != 1:
             logging.error(
                 "Failed to boolean new plate geometry for {}".format(panel.identifier)
@@ -1,4 +1,4 @@
-from helpers import algorithms, keys
+from helpers import algorithms, keys, parallel, profiling
 from helpers.geometry import ClosedPolyline
 import rhinoscriptsyntax as rs
 import logging
@@ -11,7 +11,11 @@ import Rhino.Geometry as rg
 import components.repository as repo
 
 
-def assign_exoskeleton_to_panels(exoskeleton, panels):
+@profiling.stage("exoskeleton")
+def assign_exoskeleton_to_panels(exoskeleton, panels, in_parallel=False):
+    if in_parallel:
+        return assign_exoskeleton_to_panels_parallel(exoskeleton, panels)
+
     for panel in panels:
         skeleton_part = SkeletonFactory.create_skeletonpart(exoskeleton, panel)
         if not skeleton_part:
@@ -24,6 +28,62 @@ def assign_exoskeleton_to_panels(exoskeleton, panels):
         print("Added skeleton to panel {}".format(panel.identifier))
 
 
+def assign_exoskeleton_to_panels_parallel(exoskeleton, panels, max_workers=None):
+    """
+    Splits the exoskeleton for all panels on a thread pool.
+    Every worker splits a read-only duplicate of the exoskeleton,
+    only writing the skeleton parts to the document happens serially at the end.
+
+    Returns:
+        list[(str, str)]: The identifiers of failed panels together with the reason
+    """
+
+    # resolve neighbors up front, workers are not allowed to read the document
+    jobs = []
+    for panel in panels:
+        neighbors = [
+            repo.get_component_by_part_id(neighbor_id)
+            for neighbor_id in panel.get_existing_neighbor_ids()
+        ]
+        jobs.append(
+            (panel, SkeletonFactory.calculate_cutting_planes(panel, neighbors))
+        )
+
+    def split(job, skeleton):
+        panel, planes = job
+        return SkeletonFactory.split_skeleton(skeleton, panel, planes)
+
+    results = parallel.run(
+        split,
+        jobs,
+        worker_state=lambda: exoskeleton.Duplicate(),
+        max_workers=max_workers,
+    )
+
+    # serialize all successful parts and gather failures
+    failures = []
+    for job_result in results:
+        identifier = job_result.item[0].identifier
+        if not job_result.succeeded:
+            failures.append((identifier, job_result.error))
+            continue
+
+        skeleton_part, error = job_result.result
+        if error is not None:
+            failures.append((identifier, error))
+            continue
+
+        repo.create_component(skeleton_part)
+
+    print("Added skeletons to {} panels".format(len(results) - len(failures)))
+    if failures:
+        logging.error(
+            parallel.format_report("Failed to assign exoskeleton", failures)
+        )
+
+    return failures
+
+
 def main():
 
     picked_ids = rs.GetObjects("Select Panels to generate beams for", filter=8)
@@ -42,7 +102,13 @@ def main():
         return
     exoskeleton = rs.coercebrep(exo_id)
 
-    assign_exoskeleton_to_panels(exoskeleton, panels)
+    parallel_mode = rs.GetBoolean(
+        "Split exoskeleton", ("Mode", "Serial", "Parallel"), (False,)
+    )
+    if parallel_mode is None:
+        return
+
+    assign_exoskeleton_to_panels(exoskeleton, panels, parallel_mode[0])
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@ from math import ceil
 from components.dowel import Dowel
 from components.screw import ScrewFactory
 from components.threaded_insert import ThreadedInsert
-from helpers import algorithms, keys
+from helpers import algorithms, keys, profiling
 from helpers.geometry import ClosedPolyline
 import rhinoscriptsyntax as rs
 import logging
@@ -17,6 +17,7 @@ from System import Guid
 SKELETON_THICKNESS = 3
 
 
+@profiling.stage("columns")
 def create_skeleton_dowels(panels):
     for panel in panels:
 
@@ -71,7 +72,7 @@ def create_skeleton_dowels(panels):
             origin = panel.plane.Origin
             origin.Transform(
                 rg.Transform.Translation(
-                    vptx * (dist - panel.settings.get("beam_max_width") / 2.0)
+                    vptx * (dist - panel.geometry_settings.beam_max_width / 2.0)
                 )
             )
 
@@ -80,15 +81,16 @@ def create_skeleton_dowels(panels):
             dowel_plane.Origin = origin
 
             # create column
-            column = ThreadedInsert.calculate_rough_volume(dowel_plane, 5, 50)
+            column = ThreadedInsert.volume_at(dowel_plane, 5, 50)
 
             # for some reason, column is wierd...
             column.Flip()
 
             # split column with skeleton geo
-            result = rg.Brep.CreateBooleanDifference(
-                column, skeleton.skeleton_geo, 0.001, True
-            )
+            with profiling.measure("boolean", "column"):
+                result = rg.Brep.CreateBooleanDifference(
+                    column, skeleton.skeleton_geo, 0.001, True
+                )
             if result is None:
                 logging.error(
                     "Failed to split column with skeleton for panel {}!".format(
@@ -132,7 +134,8 @@ def create_skeleton_dowels(panels):
 
         # boolean union columns to skeleton part
         columns.append(skeleton.skeleton_geo)
-        result = rg.Brep.CreateBooleanUnion(columns, 0.001, True)
+        with profiling.measure("boolean", "skeleton_columns"):
+            result = rg.Brep.CreateBooleanUnion(columns, 0.001, True)
 
         if not result:
             logging.error(
@@ -159,15 +162,22 @@ def create_skeleton_dowels(panels):
         # To create the screws, holding the skeleton part in place...
 
 
-picked_ids = rs.GetObjects("Select Panels to lay out in a grid", filter=8)
-picked_objs = [sc.doc.Objects.FindId(id) for id in picked_ids]
+def main():
+    picked_ids = rs.GetObjects("Select Panels to lay out in a grid", filter=8)
+    if picked_ids is None:
+        return
+    picked_objs = [sc.doc.Objects.FindId(id) for id in picked_ids]
+
+    group_ids = set()
+    for obj in picked_objs:
+        groups = obj.Attributes.GetGroupList()
+        for group in groups:
+            group_ids.add(group)
+
+    panels = [repo.read_component(group_index) for group_index in group_ids]
 
-group_ids = set()
-for obj in picked_objs:
-    groups = obj.Attributes.GetGroupList()
-    for group in groups:
-        group_ids.add(group)
+    create_skeleton_dowels(panels)
 
-panels = [repo.read_component(group_index) for group_index in group_ids]
 
-create_skeleton_dowels(panels)
+if __name__ == "__main__":
+    main()
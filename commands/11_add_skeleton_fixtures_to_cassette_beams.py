@@ -1,5 +1,5 @@
 from components.threaded_insert import ThreadedInsert
-from helpers import algorithms, keys
+from helpers import algorithms, keys, profiling
 from helpers.geometry import ClosedPolyline
 import rhinoscriptsyntax as rs
 import logging
@@ -14,6 +14,7 @@ from System import Guid
 INSERT_RADIUS = 5
 
 
+@profiling.stage("inserts")
 def add_threaded_inserts(panels):
     for panel in panels:
 
@@ -58,12 +59,12 @@ def add_threaded_inserts(panels):
             origin = panel.plane.Origin
             origin.Transform(
                 rg.Transform.Translation(
-                    vptx * (dist - panel.settings.get("beam_max_width") / 2.0)
+                    vptx * (dist - panel.geometry_settings.beam_max_width / 2.0)
                 )
             )
 
             # move insert plane downwards, so it is properly embedded in plate
-            z_shift = panel.settings.get("beam_thickness")
+            z_shift = panel.geometry_settings.beam_thickness
             origin.Transform(rg.Transform.Translation(panel.plane.ZAxis * -z_shift))
 
             # create insert plane
@@ -83,15 +84,22 @@ def add_threaded_inserts(panels):
             # TODO: boolean out the insert from the beams
 
 
-picked_ids = rs.GetObjects("Select Panels to lay out in a grid", filter=8)
-picked_objs = [sc.doc.Objects.FindId(id) for id in picked_ids]
+def main():
+    picked_ids = rs.GetObjects("Select Panels to lay out in a grid", filter=8)
+    if picked_ids is None:
+        return
+    picked_objs = [sc.doc.Objects.FindId(id) for id in picked_ids]
 
-group_ids = set()
-for obj in picked_objs:
-    groups = obj.Attributes.GetGroupList()
-    for group in groups:
-        group_ids.add(group)
+    group_ids = set()
+    for obj in picked_objs:
+        groups = obj.Attributes.GetGroupList()
+        for group in groups:
+            group_ids.add(group)
 
-panels = [repo.read_component(group_index) for group_index in group_ids]
+    panels = [repo.read_component(group_index) for group_index in group_ids]
 
-add_threaded_inserts(panels)
+    add_threaded_inserts(panels)
+
+
+if __name__ == "__main__":
+    main()
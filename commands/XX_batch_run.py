@@ -0,0 +1,299 @@
+import argparse
+import json
+import logging
+import os
+import shlex
+import sys
+import time
+import Rhino
+import Rhino.Geometry as rg
+import scriptcontext as sc
+import components.repository as repo
+from helpers import profiling
+
+establish_neighborhood = __import__("00_establish_neighborhood")
+create_panels = __import__("01_create_panels")
+rebuild_fab_geo = __import__("XX_rebuild_fab_geo")
+
+ARGS_ENV_KEY = "P7_BATCH_ARGS"
+"""Environment variable to pass arguments, when run through `_-RunPythonScript`"""
+
+NEIGHBORHOOD_STAGE = "neighborhood"
+PANELS_STAGE = "panels"
+
+
+def read_argv(env_key, argv=None):
+    """
+    Reads the script arguments from the command line.
+    `_-RunPythonScript` can not pass arguments, so they are read
+    from the given environment variable if the command line is empty.
+    """
+
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv and os.environ.get(env_key):
+        argv = shlex.split(os.environ[env_key])
+
+    return argv
+
+
+def parse_args(argv=None):
+    """
+    Parses the runner arguments, see `read_argv`
+    """
+
+    argv = read_argv(ARGS_ENV_KEY, argv)
+
+    parser = argparse.ArgumentParser(
+        description="Runs the fabrication pipeline on a headless document"
+    )
+    parser.add_argument("input", help="A 3dm file with panel surfaces, or a panel mesh")
+    parser.add_argument("settings", help="A json file with the geometry settings")
+    parser.add_argument("output", help="The 3dm file to write the results to")
+    parser.add_argument(
+        "--stages",
+        default=None,
+        help="Comma separated stages to run, defaults to all stages",
+    )
+    parser.add_argument(
+        "--exoskeleton-layer",
+        default=None,
+        help="The layer holding the exoskeleton brep, skeleton stages are skipped without it",
+    )
+    parser.add_argument(
+        "--outlines-only",
+        action="store_true",
+        help="Only create the detailed outlines, skipping all volume lofts and booleans",
+    )
+    parser.add_argument(
+        "--timings",
+        default=None,
+        help="The json file to write the stage timings to, defaults to <output>.timings.json",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="The json file to write a per operation profile to, profiling is off without it",
+    )
+
+    return parser.parse_args(argv)
+
+
+def mesh_to_panel_breps(mesh):
+    """
+    Creates one planar brep for every face, or ngon, of the given panel mesh
+    """
+
+    breps = []
+    for index, ngon in enumerate(mesh.GetNgonAndFacesEnumerable()):
+        boundary = mesh.Ngons.NgonBoundaryVertexList(ngon, True)
+        outline = rg.Polyline(boundary)
+        result = rg.Brep.CreatePlanarBreps(outline.ToPolylineCurve(), 0.001)
+        if result is None or result.Count != 1:
+            logging.error("Failed to create panel for mesh face {}".format(index))
+            continue
+        breps.append(result[0])
+
+    return breps
+
+
+def import_panels(doc, path, exoskeleton_layer=None):
+    """
+    Imports the input file into the document
+
+    Returns:
+        (list[Guid], Brep): The panel surface ids, and the exoskeleton if found
+    """
+
+    if not doc.Import(path):
+        raise IOError("Failed to import {}".format(path))
+
+    exoskeleton_layer_index = -1
+    if exoskeleton_layer is not None:
+        layer = doc.Layers.FindName(exoskeleton_layer)
+        if layer is None:
+            raise ValueError("Found no exoskeleton layer {}".format(exoskeleton_layer))
+        exoskeleton_layer_index = layer.Index
+
+    panel_ids = []
+    exoskeleton = None
+    for rhobj in list(doc.Objects):
+        if rhobj.Attributes.LayerIndex == exoskeleton_layer_index:
+            exoskeleton = rhobj.Geometry
+            continue
+
+        if rhobj.ObjectType == Rhino.DocObjects.ObjectType.Mesh:
+            for brep in mesh_to_panel_breps(rhobj.Geometry):
+                panel_ids.append(doc.Objects.AddBrep(brep))
+            doc.Objects.Delete(rhobj, True)
+            continue
+
+        if rhobj.ObjectType == Rhino.DocObjects.ObjectType.Brep:
+            if rhobj.Geometry.Faces.Count == 1:
+                panel_ids.append(rhobj.Id)
+
+    return panel_ids, exoskeleton
+
+
+def run_stages(
+    doc,
+    panel_ids,
+    settings,
+    stage_names=None,
+    exoskeleton=None,
+    timings=None,
+    volumes=True,
+):
+    """
+    Establishes the neighborhood of the given panel surfaces, creates the panels
+    and runs the fabrication stages on them. The document has to be the active one.
+
+    Args:
+        doc (RhinoDoc): The document holding the panel surfaces
+        panel_ids (list[Guid]): The ids of the panel surfaces
+        settings (dict): The geometry settings
+        stage_names (list[str], optional): The stages to run, defaults to all stages
+        exoskeleton (Brep, optional): The exoskeleton, skeleton stages are skipped without it
+        timings (list, optional): The list to append the stage timings to,
+        so finished stages are kept if a later stage raises
+        volumes (bool, optional): Create volumes, or only the detailed outlines
+
+    Returns:
+        list[dict]: The timing summary, one entry per stage
+    """
+
+    stages = rebuild_fab_geo.create_stages(exoskeleton, volumes=volumes)
+    known = set(stage.name for stage in stages)
+    for name in stage_names or []:
+        if name not in known and name not in [NEIGHBORHOOD_STAGE, PANELS_STAGE]:
+            raise ValueError("Unknown stage {}".format(name))
+
+    if timings is None:
+        timings = []
+
+    def timed(name, func):
+        start = time.time()
+        with profiling.MemorySampler() as memory, profiling.stage(name):
+            result = func()
+        timings.append(
+            {
+                "stage": name,
+                "seconds": time.time() - start,
+                "objects": doc.Objects.Count,
+                "peak_memory": memory.peak,
+            }
+        )
+        print("{}: {:.2f}s".format(name, timings[-1]["seconds"]))
+        return result
+
+    timed(
+        NEIGHBORHOOD_STAGE,
+        lambda: establish_neighborhood.establish_neighborhood(panel_ids),
+    )
+    gids = timed(PANELS_STAGE, lambda: create_panels.create_panels(panel_ids, settings))
+    panels = sorted(
+        [repo.read_component(gid) for gid in gids], key=lambda x: x.panel_index
+    )
+
+    for stage in stages:
+        if stage_names and stage.name not in stage_names:
+            continue
+        timed(stage.name, lambda: stage.run(panels))
+
+    return timings
+
+
+def run(
+    input_path,
+    settings_path,
+    output_path,
+    stage_names=None,
+    exoskeleton_layer=None,
+    timings_path=None,
+    profile_path=None,
+    volumes=True,
+):
+    """
+    Runs the fabrication pipeline on a new headless document,
+    without any user interaction.
+
+    Args:
+        input_path (str): A 3dm file with panel surfaces, or a panel mesh
+        settings_path (str): A json file with the geometry settings
+        output_path (str): The 3dm file to write the results to
+        stage_names (list[str], optional): The stages to run, defaults to all stages
+        exoskeleton_layer (str, optional): The layer holding the exoskeleton brep
+        timings_path (str, optional): The json file to write the stage timings to
+        profile_path (str, optional): The json file to write a per operation profile to
+        volumes (bool, optional): Create volumes, or only the detailed outlines
+
+    Returns:
+        list[dict]: The timing summary, one entry per stage
+    """
+
+    with open(settings_path) as settings_file:
+        settings = json.load(settings_file)
+
+    if timings_path is None:
+        timings_path = "{}.timings.json".format(os.path.splitext(output_path)[0])
+
+    if profile_path is not None:
+        profiling.reset()
+        profiling.enable()
+
+    doc = Rhino.RhinoDoc.CreateHeadless(None)
+    active_doc = sc.doc
+    sc.doc = doc
+    repo.clear_cache()
+
+    # finished stages are written, even if a later stage raises
+    timings = []
+
+    try:
+        panel_ids, exoskeleton = import_panels(doc, input_path, exoskeleton_layer)
+        run_stages(
+            doc,
+            panel_ids,
+            settings,
+            stage_names,
+            exoskeleton,
+            timings=timings,
+            volumes=volumes,
+        )
+        doc.Write3dmFile(output_path, Rhino.FileIO.FileWriteOptions())
+
+    finally:
+        sc.doc = active_doc
+        repo.clear_cache()
+        doc.Dispose()
+
+        with open(timings_path, "w") as timings_file:
+            json.dump(timings, timings_file, indent=2)
+
+        if profile_path is not None:
+            profiling.dump(profile_path)
+            profiling.disable()
+
+    return timings
+
+
+def main():
+    args = parse_args()
+    stage_names = None
+    if args.stages:
+        stage_names = [name.strip() for name in args.stages.split(",")]
+
+    run(
+        args.input,
+        args.settings,
+        args.output,
+        stage_names,
+        args.exoskeleton_layer,
+        args.timings,
+        args.profile,
+        not args.outlines_only,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import argparse
+import json
+import logging
+import traceback
+import Rhino
+import Rhino.Geometry as rg
+import scriptcontext as sc
+import components.repository as repo
+from helpers import facades
+
+create_panels = __import__("01_create_panels")
+batch_run = __import__("XX_batch_run")
+
+ARGS_ENV_KEY = "P7_BENCHMARK_ARGS"
+"""Environment variable to pass arguments, when run through `_-RunPythonScript`"""
+
+DEFAULT_SIZES = [10, 100, 1000]
+
+
+def parse_args(argv=None):
+    """
+    Parses the benchmark arguments, see `XX_batch_run.read_argv`
+    """
+
+    argv = batch_run.read_argv(ARGS_ENV_KEY, argv)
+
+    parser = argparse.ArgumentParser(
+        description="Times the fabrication pipeline on synthetic facades"
+    )
+    parser.add_argument("report", help="The json file to write the report to")
+    parser.add_argument(
+        "--patterns",
+        default=",".join(sorted(facades.FACADES)),
+        help="Comma separated facade patterns, defaults to all patterns",
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma separated panel counts, between 10 and 5000",
+    )
+    parser.add_argument(
+        "--fold", type=float, default=0.3, help="The relative fold height"
+    )
+    parser.add_argument(
+        "--settings",
+        default=None,
+        help="A json file with the geometry settings, defaults to the panel defaults",
+    )
+    parser.add_argument(
+        "--stages",
+        default=None,
+        help="Comma separated stages to run, defaults to all stages",
+    )
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help="An earlier report to compare the results to",
+    )
+
+    return parser.parse_args(argv)
+
+
+def add_panel_surfaces(doc, outlines):
+    """
+    Adds planar surfaces for the given outlines to the document
+
+    Returns:
+        list[Guid]: The ids of the added surfaces
+    """
+
+    ids = []
+    for index, outline in enumerate(outlines):
+        result = rg.Brep.CreatePlanarBreps(outline.ToPolylineCurve(), 0.001)
+        if result is None or result.Count != 1:
+            logging.error("Failed to create surface for panel {}".format(index))
+            continue
+        ids.append(doc.Objects.AddBrep(result[0]))
+
+    return ids
+
+
+def run_case(pattern, count, settings, stage_names=None, fold=0.3):
+    """
+    Times all stages for a single synthetic facade, on a new headless document
+
+    Args:
+        pattern (str): The facade pattern, see `helpers.facades.FACADES`
+        count (int): The number of panels
+        settings (dict): The geometry settings
+        stage_names (list[str], optional): The stages to run, defaults to all stages
+        fold (float, optional): The relative fold height
+
+    Returns:
+        dict: The case result, with the stage timings, or an error if a stage failed
+    """
+
+    case = {"pattern": pattern, "panels": count, "stages": [], "error": None}
+
+    doc = Rhino.RhinoDoc.CreateHeadless(None)
+    active_doc = sc.doc
+    sc.doc = doc
+    repo.clear_cache()
+
+    try:
+        panel_ids = add_panel_surfaces(doc, facades.FACADES[pattern](count, fold=fold))
+        batch_run.run_stages(
+            doc, panel_ids, settings, stage_names, timings=case["stages"]
+        )
+    except Exception:
+        case["error"] = traceback.format_exc()
+        logging.error("Benchmark {} x {} failed".format(pattern, count))
+
+    finally:
+        sc.doc = active_doc
+        repo.clear_cache()
+        doc.Dispose()
+
+    return case
+
+
+def _stage_seconds(report):
+    return {
+        (case["pattern"], case["panels"], stage["stage"]): stage["seconds"]
+        for case in report["cases"]
+        for stage in case["stages"]
+    }
+
+
+def format_report(report, baseline=None):
+    """
+    Formats a benchmark report as a table, one row per case and stage
+
+    Args:
+        report (dict): The report, see `run`
+        baseline (dict, optional): An earlier report to add the relative change to
+
+    Returns:
+        str: The formatted table
+    """
+
+    baseline_seconds = {}
+    if baseline is not None:
+        baseline_seconds = _stage_seconds(baseline)
+
+    lines = [
+        "{:<10}{:>8}  {:<16}{:>10}{:>10}{:>10}{:>10}".format(
+            "pattern", "panels", "stage", "seconds", "objects", "peak MB", "change"
+        )
+    ]
+    for case in report["cases"]:
+        if case["error"] is not None:
+            lines.append(
+                "{:<10}{:>8}  failed: {}".format(
+                    case["pattern"],
+                    case["panels"],
+                    case["error"].strip().split("\n")[-1],
+                )
+            )
+
+        for stage in case["stages"]:
+            change = ""
+            before = baseline_seconds.get(
+                (case["pattern"], case["panels"], stage["stage"])
+            )
+            if before:
+                change = "{:+.0%}".format(stage["seconds"] / before - 1.0)
+
+            lines.append(
+                "{:<10}{:>8}  {:<16}{:>10.2f}{:>10}{:>10.0f}{:>10}".format(
+                    case["pattern"],
+                    case["panels"],
+                    stage["stage"],
+                    stage["seconds"],
+                    stage["objects"],
+                    stage["peak_memory"] / 1048576.0,
+                    change,
+                )
+            )
+
+    return "\n".join(lines)
+
+
+def run(report_path, patterns, sizes, settings=None, stage_names=None, fold=0.3):
+    """
+    Runs the benchmark for every combination of pattern and size,
+    and writes the results to a json report
+
+    Args:
+        report_path (str): The json file to write the report to
+        patterns (list[str]): The facade patterns, see `helpers.facades.FACADES`
+        sizes (list[int]): The panel counts
+        settings (dict, optional): The geometry settings, defaults to the panel defaults
+        stage_names (list[str], optional): The stages to run, defaults to all stages
+        fold (float, optional): The relative fold height
+
+    Returns:
+        dict: The report
+    """
+
+    for pattern in patterns:
+        if pattern not in facades.FACADES:
+            raise ValueError("Unknown facade pattern {}".format(pattern))
+
+    if settings is None:
+        settings = create_panels.DEFAULT_SETTINGS
+
+    report = {
+        "rhino": str(Rhino.RhinoApp.Version),
+        "fold": fold,
+        "settings": dict(settings),
+        "cases": [],
+    }
+    for pattern in patterns:
+        for size in sizes:
+            print("Benchmarking {} facade with {} panels".format(pattern, size))
+            report["cases"].append(run_case(pattern, size, settings, stage_names, fold))
+
+            # write after every case, so a crash keeps the finished cases
+            with open(report_path, "w") as report_file:
+                json.dump(report, report_file, indent=2)
+
+    return report
+
+
+def main():
+    args = parse_args()
+
+    settings = None
+    if args.settings:
+        with open(args.settings) as settings_file:
+            settings = json.load(settings_file)
+
+    stage_names = None
+    if args.stages:
+        stage_names = [name.strip() for name in args.stages.split(",")]
+
+    report = run(
+        args.report,
+        [pattern.strip() for pattern in args.patterns.split(",")],
+        [int(size) for size in args.sizes.split(",")],
+        settings,
+        stage_names,
+        args.fold,
+    )
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    print(format_report(report, baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ from components.dowel import Dowel
 from components.screw import Screw
 from components.skeleton_part import SkeletonPart
 from components.threaded_insert import ThreadedInsert
-from helpers import algorithms, keys
+from helpers import algorithms, keys, booleans, parallel, profiling
 from helpers.geometry import ClosedPolyline
 import rhinoscriptsyntax as rs
 import logging
@@ -15,64 +15,118 @@ import components.repository as repo
 from System.Collections.Generic import List
 
 
-def group_by_parent(volume_comps):
-    parent_dict = dict()
-    for comp in volume_comps:
-        if comp.parent_identifier in parent_dict:
-            parent_dict[comp.parent_identifier].append(comp)
-        else:
-            parent_dict[comp.parent_identifier] = [comp]
+def get_cutter_set(panel):
+    cutters = []
+    for component_type in [Dowel, Screw, ThreadedInsert]:
+        for cylinder in repo.get_components_by_parent(panel.identifier, component_type):
+            cutters.append(cylinder.volume_geometry)
 
-    return parent_dict
+    return booleans.CutterSet(cutters)
 
 
-picked_ids = rs.GetObjects("Select Panels to lay out in a grid", filter=8)
-picked_objs = [sc.doc.Objects.FindId(id) for id in picked_ids]
+@profiling.stage("booleans")
+def boolean_detail_cassettes(panels, in_parallel=False):
+    if in_parallel:
+        return boolean_detail_cassettes_parallel(panels)
 
-group_ids = set()
-for obj in picked_objs:
-    groups = obj.Attributes.GetGroupList()
-    for group in groups:
-        group_ids.add(group)
+    for panel, cassette_components in repo.get_cassettes(panels):
+        # get cutout geos, spatially indexed
+        cutter_set = get_cutter_set(panel)
+        if not cutter_set:
+            continue
 
-panels = [repo.read_component(group_index) for group_index in group_ids]
+        # iterate over cassette components and subtract overlapping cutouts
+        for comp in cassette_components:
+            if isinstance(comp, SkeletonPart):
+                continue
+            if comp.detailed_volume_geometry is None:
+                continue
 
-# get all screws
-dowels = repo.get_all_components(Dowel)
-screws = repo.get_all_components(Screw)
-inserts = repo.get_all_components(ThreadedInsert)
+            result = booleans.detail_volume(
+                comp.detailed_volume_geometry,
+                cutter_set,
+                cache=booleans.DIFFERENCE_CACHE,
+            )
+            if result is None:
+                continue
 
-# group by parents
-dowels = group_by_parent(dowels)
-screws = group_by_parent(screws)
-inserts = group_by_parent(inserts)
+            comp.detailed_volume_geometry = result
+            repo.update_component(comp)
 
-for panel in panels:
-    # get cassette from panel
-    cassette_components = repo.get_cassette_from_panel(panel)
 
-    # get cutout geos
-    cutouts = List[rg.Brep]()
-    for dowel in dowels[panel.identifier]:
-        cutouts.Add(dowel.volume_geometry)
-    for screw in screws[panel.identifier]:
-        cutouts.Add(screw.volume_geometry)
-    for insert in inserts[panel.identifier]:
-        cutouts.Add(insert.volume_geometry)
+def boolean_detail_cassettes_parallel(panels, timeout=60.0, max_workers=None):
+    """
+    Runs the boolean differences of all cassettes on a thread pool
+    and commits all results in one batch at the end.
 
-    # iterate over cassette components and transform them
-    for comp in cassette_components:
-        if isinstance(comp, SkeletonPart):
-            continue
-        volume = List[rg.Brep]()
-        volume.Add(comp.detailed_volume_geometry)
-        result = rg.Brep.CreateBooleanDifference(volume, cutouts, 0.001)
-        print(comp.identifier, result.Count)
-        if result.Count == 0:
+    Returns:
+        list[(str, str)]: The identifiers of failed components together with the reason
+    """
+
+    # collect jobs up front, workers are not allowed to read the document
+    jobs = []
+    for panel, cassette_components in repo.get_cassettes(panels):
+        cutter_set = get_cutter_set(panel)
+        if not cutter_set:
             continue
-        if result.Count == 1:
-            comp.detailed_volume_geometry = result[0]
-            repo.update_component(comp)
-        if result.Count == 2:
-            comp.detailed_volume_geometry = result[0]
-            repo.update_component(comp)
+
+        for comp in cassette_components:
+            if isinstance(comp, SkeletonPart):
+                continue
+            if comp.detailed_volume_geometry is None:
+                continue
+
+            cutters = cutter_set.overlapping(comp.detailed_volume_geometry)
+            if not cutters:
+                continue
+
+            jobs.append(
+                booleans.BooleanJob(comp, comp.detailed_volume_geometry, cutters)
+            )
+
+    succeeded, failures = booleans.run_difference_jobs(
+        jobs, timeout=timeout, max_workers=max_workers, cache=booleans.DIFFERENCE_CACHE
+    )
+
+    # commit all results in one batch
+    sc.doc.Views.RedrawEnabled = False
+    try:
+        for job, result in succeeded:
+            job.component.detailed_volume_geometry = result
+            repo.update_component(job.component)
+    finally:
+        sc.doc.Views.RedrawEnabled = True
+
+    failures = [(job.component.identifier, error) for job, error in failures]
+    print("Detailed {} components".format(len(succeeded)))
+    if failures:
+        logging.error(parallel.format_report("Failed to boolean detail", failures))
+
+    return failures
+
+
+def main():
+    picked_ids = rs.GetObjects("Select Panels to lay out in a grid", filter=8)
+    if picked_ids is None:
+        return
+    picked_objs = [sc.doc.Objects.FindId(id) for id in picked_ids]
+
+    group_ids = set()
+    for obj in picked_objs:
+        groups = obj.Attributes.GetGroupList()
+        for group in groups:
+            group_ids.add(group)
+
+    panels = [repo.read_component(group_index) for group_index in group_ids]
+
+    parallel_mode = rs.GetBoolean(
+        "Boolean detailing", ("Mode", "Serial", "Parallel"), (False,)
+    )
+    if parallel_mode is None:
+        return
+
+    boolean_detail_cassettes(panels, parallel_mode[0])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import logging
+import os
+import rhinoscriptsyntax as rs
+import scriptcontext as sc
+import Rhino.Geometry as rg
+from components.panel import Panel
+from helpers import export, keys, parallel
+import components.repository as repo
+
+PART_GEOMETRY_ATTRIBUTES = ["detailed_volume_geometry", "skeleton_geo"]
+"""The component attributes holding the geometry to fabricate, in order of preference"""
+
+
+def get_part_geometry(component):
+    for name in PART_GEOMETRY_ATTRIBUTES:
+        geometry = getattr(component, name, None)
+        if geometry is not None:
+            return geometry
+
+
+def iter_cassettes(doc=None):
+    """
+    Walks over all cassettes of the document, one at a time.
+    Nothing is kept in the repository cache, so only the yielded cassette is in memory.
+
+    Yields:
+        (Panel, list[Component]): The panel, and the beams, plate and skeleton part of it's cassette
+    """
+
+    for panel in repo.iter_components(Panel, doc, cache=False):
+        yield panel, repo.get_cassette_from_panel(panel, doc, cache=False)
+
+
+def export_cassettes(directory, file_format="3dm", doc=None):
+    """
+    Exports the fabrication geometry of every cassette part to it's own file,
+    laid flat by the panel fabrication transform, the same way `XX_transform_cassettes` does.
+    Files are written to one sub directory per panel.
+
+    Args:
+        directory (str): The directory to export to
+        file_format (str, optional): One of `helpers.export.FORMATS`
+        doc (RhinoDoc, optional): The document to export from
+
+    Returns:
+        (int, list[(str, str)]): The number of written files, and the failed parts with an error message
+    """
+
+    written = 0
+    failures = []
+
+    for panel, components in iter_cassettes(doc):
+        xform = panel.fabrication_transform
+
+        for component in components:
+            geometry = get_part_geometry(component)
+            if geometry is None:
+                failures.append((component.identifier, "Has no fabrication geometry"))
+                continue
+
+            # document geometry must never be changed in place
+            flat = geometry.Duplicate()
+            flat.Transform(xform)
+
+            path = os.path.join(directory, panel.identifier, component.identifier)
+            try:
+                success, path = export.write_part(path, [flat], file_format)
+            except Exception as e:
+                success = False
+                logging.error("Failed to export {}: {}".format(path, e))
+
+            if not success:
+                failures.append((component.identifier, "Failed to write file"))
+                continue
+
+            written += 1
+
+    return written, failures
+
+
+def get_part_outlines(component, tolerance=0.01):
+    """
+    Gets the detailed top and bottom outlines of a beam or plate,
+    in part local coordinates, as polylines.
+    Only the sawtooths are part of the outlines, plate cutouts and dowel holes are not.
+
+    Returns:
+        list[(str, list[Polyline])]: The outlines by layer name, or None for other components.
+        Empty if an outline is missing, so the part is skipped instead of exported without sawtooths.
+    """
+
+    if not hasattr(component, "get_detailed_outline"):
+        return
+
+    xform = rg.Transform.PlaneToPlane(component.plane, rg.Plane.WorldXY)
+    layers = []
+    for key in [keys.TOP_OUTLINE_KEY, keys.BOTTOM_OUTLINE_KEY]:
+        outline = component.get_detailed_outline(key)
+        if outline is None:
+            return []
+
+        # document geometry must never be changed in place
+        outline = outline.DuplicateCurve()
+        outline.Transform(xform)
+
+        pline = export.to_polyline(outline, tolerance)
+        if pline is not None:
+            layers.append((key, [pline]))
+
+    return layers
+
+
+def export_outlines(directory, file_format="dxf", tolerance=0.01, doc=None):
+    """
+    Exports the detailed 2d outlines of every beam and plate to it's own file,
+    in part local coordinates. Only the outlines are read, no volume is needed,
+    so this works on documents created without volumes, too.
+
+    Args:
+        directory (str): The directory to export to
+        file_format (str, optional): One of `helpers.export.OUTLINE_FORMATS`
+        tolerance (float, optional): The maximum deviation of the polylines from the outlines
+        doc (RhinoDoc, optional): The document to export from
+
+    Returns:
+        (int, list[(str, str)]): The number of written files, and the failed parts with an error message
+    """
+
+    written = 0
+    failures = []
+
+    for panel, components in iter_cassettes(doc):
+        for component in components:
+            layers = get_part_outlines(component, tolerance)
+            if layers is None:
+                continue
+            if not layers:
+                failures.append((component.identifier, "Has no outlines"))
+                continue
+
+            path = os.path.join(directory, panel.identifier, component.identifier)
+            try:
+                export.write_outlines(path, layers, file_format)
+            except Exception as e:
+                failures.append((component.identifier, str(e)))
+                continue
+
+            written += 1
+
+    return written, failures
+
+
+def main():
+    directory = rs.BrowseForFolder(message="Select a folder to export to")
+    if not directory:
+        return
+
+    mode = rs.GetString("Export", "Volumes", ["Volumes", "Outlines"])
+    if mode == "Outlines":
+        file_format = rs.GetString("Outline format", "dxf", export.OUTLINE_FORMATS)
+        if file_format not in export.OUTLINE_FORMATS:
+            return
+        written, failures = export_outlines(directory, file_format)
+    elif mode == "Volumes":
+        file_format = rs.GetString("Export format", "3dm", export.FORMATS)
+        if file_format not in export.FORMATS:
+            return
+        written, failures = export_cassettes(directory, file_format)
+    else:
+        return
+
+    print("Exported {} parts to {}".format(written, directory))
+    if failures:
+        print(parallel.format_report("Export", failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import rhinoscriptsyntax as rs
+import scriptcontext as sc
+import Rhino.Geometry as rg
+from components.beam import Beam
+from components.plate import Plate
+from helpers import nesting, serde
+
+export_fabrication = __import__("XX_export_fabrication")
+
+LAYER_NAME = "Nesting"
+SHEET_SPACING = 500
+"""The distance between two baked sheets"""
+
+DEFAULT_SHEET_SIZE = (2500, 1250)
+DEFAULT_TOOLHEAD_RADIUS = 4
+
+
+def collect_parts(doc=None):
+    """
+    Collects the flattened detailed outlines of all beams and plates,
+    one cassette at a time.
+
+    Returns:
+        (dict[type: list[NestingPart]], float): The parts by component type,
+        and the toolhead radius of the panels
+    """
+
+    parts = {Beam: [], Plate: []}
+    toolhead_radius = None
+
+    for panel, components in export_fabrication.iter_cassettes(doc):
+        if toolhead_radius is None:
+            toolhead_radius = panel.geometry_settings.toolhead_radius
+
+        for component in components:
+            if type(component) not in parts:
+                continue
+
+            layers = export_fabrication.get_part_outlines(component)
+            outlines = [pline for _, plines in layers or [] for pline in plines]
+            if not outlines:
+                continue
+
+            parts[type(component)].append(
+                nesting.NestingPart(component.identifier, outlines)
+            )
+
+    if toolhead_radius is None:
+        toolhead_radius = DEFAULT_TOOLHEAD_RADIUS
+
+    return parts, toolhead_radius
+
+
+def nest_parts(sheet_sizes=None, rotation_steps=4, doc=None):
+    """
+    Nests all beams and plates onto stock sheets, beams and plates separately,
+    as they are cut from different material thicknesses.
+
+    Args:
+        sheet_sizes (dict[type: (float, float)], optional): The sheet width and height per component type
+        rotation_steps (int, optional): The number of rotations to try per full turn
+        doc (RhinoDoc, optional): The document to read the parts from
+
+    Returns:
+        dict[type: (list[Sheet], list[NestingPart])]: The sheets and unplaced parts per component type
+    """
+
+    if sheet_sizes is None:
+        sheet_sizes = {}
+
+    parts, toolhead_radius = collect_parts(doc)
+
+    results = {}
+    for component_type, type_parts in parts.items():
+        width, height = sheet_sizes.get(component_type, DEFAULT_SHEET_SIZE)
+        results[component_type] = nesting.nest(
+            type_parts, width, height, toolhead_radius, rotation_steps
+        )
+
+    return results
+
+
+def bake_sheets(component_type, sheets, origin, doc=None):
+    """
+    Adds the sheet rectangles and the placed outlines to a layer per component type
+
+    Args:
+        component_type (type): The type of the nested components
+        sheets (list[Sheet]): The nested sheets
+        origin (Point3d): The lower left corner of the first sheet
+        doc (RhinoDoc, optional): The document to add to
+    """
+
+    if doc is None:
+        doc = sc.doc
+
+    parent = doc.Layers.FindIndex(serde.add_or_find_layer(LAYER_NAME, doc))
+    layer_index = serde.add_or_find_layer(
+        "{}{}{}".format(LAYER_NAME, serde.SEPERATOR, component_type._LAYER_NAME),
+        doc,
+        serde.CURVE_COLOR,
+        parent,
+    )
+
+    for sheet in sheets:
+        offset = rg.Transform.Translation(
+            origin.X + sheet.index * (sheet.width + SHEET_SPACING), origin.Y, 0.0
+        )
+
+        rect = rg.Rectangle3d(rg.Plane.WorldXY, sheet.width, sheet.height)
+        rect.Transform(offset)
+        serde.serialize_geometry(
+            rect.ToNurbsCurve(), layer_index, doc, "sheet_{}".format(sheet.index)
+        )
+
+        for placement in sheet.placements:
+            xform = offset * placement.xform
+            for outline in placement.part.outlines:
+                curve = outline.ToPolylineCurve()
+                curve.Transform(xform)
+                serde.serialize_geometry(
+                    curve, layer_index, doc, placement.part.identifier
+                )
+
+
+def main():
+    width = rs.GetReal("Sheet width", DEFAULT_SHEET_SIZE[0], 1)
+    if width is None:
+        return
+    height = rs.GetReal("Sheet height", DEFAULT_SHEET_SIZE[1], 1)
+    if height is None:
+        return
+    rotation_steps = rs.GetInteger("Rotation steps per full turn", 4, 1, 360)
+    if rotation_steps is None:
+        return
+
+    results = nest_parts(
+        {Beam: (width, height), Plate: (width, height)}, rotation_steps
+    )
+
+    y = 0.0
+    for component_type, (sheets, unplaced) in results.items():
+        bake_sheets(component_type, sheets, rg.Point3d(0, y, 0))
+        y -= height + SHEET_SPACING
+
+        print(nesting.format_report(component_type._LAYER_NAME, sheets, unplaced))
+
+    sc.doc.Views.Redraw()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+from components.beam import Beam
+from components.dowel import Dowel
+from components.panel import Panel
+from components.plate import Plate
+from components.screw import Screw
+from components.threaded_insert import ThreadedInsert
+from helpers import keys
+from helpers.pipeline import RebuildGraph, Stage
+import rhinoscriptsyntax as rs
+import scriptcontext as sc
+import components.repository as repo
+
+create_beams = __import__("02_create_beams")
+create_plates = __import__("03_create_plates")
+create_dowels = __import__("04_create_plate_dowels")
+create_joints = __import__("05_create_joints")
+add_sawtooths_to_beams = __import__("06_add_sawtooths_to_beams")
+add_sawtooths_to_plates = __import__("07_add_sawtooths_to_plates")
+add_plate_cutouts = __import__("08_add_plate_cutouts")
+add_exoskeleton = __import__("09_add_exoskeleton_to_panels")
+add_skeleton_columns = __import__("10_add_skeleton_columns")
+add_skeleton_fixtures = __import__("11_add_skeleton_fixtures_to_cassette_beams")
+boolean_detail = __import__("XX_boolean_detail_cassettes")
+
+
+def get_panel_joint_ids(panels):
+    """
+    Gets the group indices of all joints connected to the given panels
+    """
+
+    gids = set()
+    for panel in panels:
+        gids.update(repo.search_components("{} x *".format(panel.identifier)))
+        gids.update(repo.search_components("* x {}".format(panel.identifier)))
+
+    return sorted(gids)
+
+
+def get_panel_joints(panels):
+    return [repo.read_component(gid) for gid in get_panel_joint_ids(panels)]
+
+
+def delete_components(gids):
+    for gid in gids:
+        repo.delete_component(gid)
+
+
+def clear_by_pattern(pattern):
+    def clear(panels):
+        for panel in panels:
+            delete_components(repo.search_components(pattern.format(panel.identifier)))
+
+    return clear
+
+
+def clear_by_parent(*component_types):
+    def clear(panels):
+        for panel in panels:
+            for component_type in component_types:
+                delete_components(
+                    repo.get_component_ids_by_parent(panel.identifier, component_type)
+                )
+
+    return clear
+
+
+def clear_beam_sawtooths(create_volumes):
+    def clear(panels):
+        for _, cassette_components in repo.get_cassettes(panels):
+            for comp in cassette_components:
+                if not isinstance(comp, Beam):
+                    continue
+                comp.reset_detailed_geometry(create_volumes)
+                repo.mark_dirty(comp)
+
+        repo.commit_changes()
+
+    return clear
+
+
+def clear_plate_sawtooths(create_volumes):
+    def clear(panels):
+        for _, cassette_components in repo.get_cassettes(panels):
+            for comp in cassette_components:
+                if not isinstance(comp, Plate):
+                    continue
+                comp.reset_detailed_edges()
+                if create_volumes:
+                    comp.create_and_set_detail_geometry()
+                repo.mark_dirty(comp)
+
+        repo.commit_changes()
+
+    return clear
+
+
+def clear_booleans(panels):
+    """
+    Lofts the detailed volumes from the sawtooth outlines again,
+    so holes of removed or resized cutters don't survive a re-run
+    """
+
+    for _, cassette_components in repo.get_cassettes(panels):
+        for comp in cassette_components:
+            if not isinstance(comp, (Beam, Plate)):
+                continue
+            comp.create_and_set_detail_geometry()
+            repo.mark_dirty(comp)
+
+    repo.commit_changes()
+
+    # the plate cutout is part of the detailed volume, too
+    add_plate_cutouts.add_plate_cutout(panels)
+
+
+def create_stages(exoskeleton=None, details=True, volumes=True):
+    """
+    Creates the stages of the fabrication pipeline
+
+    Args:
+        exoskeleton (Brep, optional): The exoskeleton to split into skeleton parts.
+        If None is given, the skeleton stages are skipped.
+        details (bool, optional): Add the plate cutout and boolean detailing stages
+        volumes (bool, optional): Loft the detailed beam and plate volumes.
+        Without volumes only the detailed outlines are created, for a 2d fabrication run,
+        and all volume based stages are skipped.
+
+    Returns:
+        list[Stage]: The stages in run order
+    """
+
+    stages = [
+        Stage(
+            "beams",
+            create_beams.create_beams,
+            clear=clear_by_pattern(keys.panel_beam_identifier("{}", "?", "?")),
+            settings=["beam_max_width", "beam_thickness"],
+        ),
+        Stage(
+            "plates",
+            create_plates.create_plates,
+            clear=clear_by_pattern(keys.panel_plate_identifier("{}")),
+            settings=["beam_thickness", "plate_thickness"],
+        ),
+        Stage(
+            "dowels",
+            create_dowels.create_dowels,
+            depends_on=["beams"],
+            clear=clear_by_parent(Dowel),
+            settings=["beam_thickness", "plate_thickness", "dowel_radius"],
+        ),
+        Stage(
+            "joints",
+            create_joints.create_joints,
+            uses_neighbors=True,
+            clear=lambda panels: delete_components(get_panel_joint_ids(panels)),
+            settings=["beam_thickness"],
+        ),
+        # outline only stages are named differently, so a later run with volumes re-runs them
+        Stage(
+            "beam_sawtooths" if volumes else "beam_sawtooth_outlines",
+            lambda panels: add_sawtooths_to_beams.add_sawtooths_to_beams(
+                get_panel_joints(panels), volumes
+            ),
+            depends_on=["beams", "joints"],
+            neighbor_depends_on=["beams"],
+            clear=clear_beam_sawtooths(volumes),
+            settings=[
+                "beam_max_width",
+                "sawtooth_depth",
+                "sawtooth_width",
+                "toolhead_radius",
+            ],
+        ),
+        Stage(
+            "plate_sawtooths" if volumes else "plate_sawtooth_outlines",
+            lambda panels: add_sawtooths_to_plates.add_sawtooths_to_plates(
+                get_panel_joints(panels), volumes
+            ),
+            depends_on=["plates", "joints"],
+            neighbor_depends_on=["plates"],
+            clear=clear_plate_sawtooths(volumes),
+            settings=["beam_max_width", "sawtooth_depth", "sawtooth_width"],
+        ),
+    ]
+
+    if not details or not volumes:
+        return stages
+
+    # plate sawtooths of a neighbor re-create our detailed plate volume
+    stages.append(
+        Stage(
+            "cutouts",
+            add_plate_cutouts.add_plate_cutout,
+            depends_on=["plate_sawtooths"],
+            neighbor_depends_on=["plate_sawtooths"],
+            settings=["plate_thickness"],
+        )
+    )
+
+    if exoskeleton is not None:
+
+        # columns are unioned into the skeleton part, so they can't run on their own
+        def add_skeleton(panels):
+            add_exoskeleton.assign_exoskeleton_to_panels(exoskeleton, panels)
+            add_skeleton_columns.create_skeleton_dowels(panels)
+
+        def clear_skeleton(panels):
+            clear_by_pattern(keys.panel_skeleton_identifier("{}"))(panels)
+            clear_by_parent(Screw)(panels)
+
+        stages.append(
+            Stage(
+                "skeleton",
+                add_skeleton,
+                uses_neighbors=True,
+                clear=clear_skeleton,
+                settings=["beam_max_width"],
+            )
+        )
+        stages.append(
+            Stage(
+                "inserts",
+                add_skeleton_fixtures.add_threaded_inserts,
+                uses_neighbors=True,
+                clear=clear_by_parent(ThreadedInsert),
+                settings=["beam_max_width", "beam_thickness"],
+            )
+        )
+
+    # beam sawtooths of a neighbor re-create our detailed beam volumes
+    stages.append(
+        Stage(
+            "booleans",
+            boolean_detail.boolean_detail_cassettes,
+            depends_on=[stage.name for stage in stages if stage.name != "joints"],
+            neighbor_depends_on=["beam_sawtooths"],
+            clear=clear_booleans,
+            # settings only reach the booleans through the detailed geometry
+            settings=[],
+        )
+    )
+
+    return stages
+
+
+def rebuild(stages, force=False, panel_ids=None):
+    """
+    Re-runs the stale stages of all panels
+
+    Args:
+        stages (list[Stage]): The stages to run, see `create_stages()`
+        force (bool, optional): Re-run every stage, even if it's up to date
+        panel_ids (list[int], optional): Group indices of the panels to rebuild,
+        None rebuilds every panel in the document
+    """
+
+    panels = sorted(repo.get_all_components(Panel), key=lambda x: x.panel_index)
+
+    only = None
+    if panel_ids is not None:
+        only = [repo.read_component(gid).identifier for gid in panel_ids]
+
+    graph = RebuildGraph(stages)
+    rebuilt = graph.rebuild(panels, force, only)
+
+    for stage in stages:
+        identifiers = rebuilt.get(stage.name)
+        if identifiers:
+            print("Rebuilt {} for {} panels".format(stage.name, len(identifiers)))
+
+    return rebuilt
+
+
+def main():
+    exo_id = rs.GetObject("Select exoskeleton, or press enter to skip", filter=16)
+    exoskeleton = None
+    if exo_id is not None:
+        exoskeleton = rs.coercebrep(exo_id)
+
+    rebuild(create_stages(exoskeleton))
+
+    sc.doc.Views.Redraw()
+
+
+if __name__ == "__main__":
+    main()
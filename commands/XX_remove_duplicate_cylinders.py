@@ -0,0 +1,17 @@
+from components.dowel import Dowel
+from components.screw import Screw
+from components.threaded_insert import ThreadedInsert
+import scriptcontext as sc
+import components.repository as repo
+
+
+def main():
+    for component_type in [Dowel, Screw, ThreadedInsert]:
+        removed = repo.remove_duplicate_cylinders(component_type)
+        print("Removed {} duplicate {}".format(removed, component_type._LAYER_NAME))
+
+    sc.doc.Views.Redraw()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,16 @@ import Rhino.Geometry as rg
 import scriptcontext as sc
 import helpers.algorithms as algorithms
 from helpers.geometry import ClosedPolyline
-from components.component import Component
+from components.component import Component, LazyGeometry
 import math
-from helpers import serde, keys
+from helpers import profiling, serde, keys
 from System import Guid
 
 THICKNESS_KEY = "thickness"
 NEIGHBOR_ANGLES_KEY = "neighbor_angles"
 TOOTH_COUNT_KEY = "tooth_count"
 TOOLHEAD_RADIUS_KEY = "toolhead_radius"
+DETAILED_OUTLINE_PREFIX = "detailed_"
 
 
 class Beam(Component):
@@ -25,18 +26,37 @@ class Beam(Component):
     """The material thickness of the beam"""
     neighbor_angles = {key: 0.0 for key in keys.edge_keys(4)}
     """A dictionary of the angles towards neighbors at every beam edge"""
-    outlines = {keys.TOP_OUTLINE_KEY: None, keys.BOTTOM_OUTLINE_KEY: None}
+    outlines = LazyGeometry(
+        "outlines",
+        "outline_ids",
+        lambda curve: ClosedPolyline(curve.ToPolyline()),
+        {keys.TOP_OUTLINE_KEY: None, keys.BOTTOM_OUTLINE_KEY: None},
+    )
     """A dictionary of the top and bottom simple outlines"""
-    outline_ids = {key: Guid.Empty for key in outlines}
+    outline_ids = {
+        key: Guid.Empty for key in [keys.TOP_OUTLINE_KEY, keys.BOTTOM_OUTLINE_KEY]
+    }
     """A dictionary of the simple outline ids in the rhino doc"""
-    volume_geometry = None
+    volume_geometry = LazyGeometry("volume_geometry", "volume_id")
     """The geometry of the simple beam volume"""
     volume_id = Guid.Empty
     """The id of the simple geometry"""
-    detailed_volume_geometry = None
+    detailed_volume_geometry = LazyGeometry(
+        "detailed_volume_geometry", "detailed_volume_id"
+    )
     """The detailed geometry with all cutouts added"""
     detailed_volume_id = Guid.Empty
     """The id of the detailed geometry in the rhino doc"""
+    detailed_outlines = LazyGeometry(
+        "detailed_outlines",
+        "detailed_outline_ids",
+        default={keys.TOP_OUTLINE_KEY: None, keys.BOTTOM_OUTLINE_KEY: None},
+    )
+    """A dictionary of the top and bottom outlines with sawtooths, as curves"""
+    detailed_outline_ids = {
+        key: Guid.Empty for key in [keys.TOP_OUTLINE_KEY, keys.BOTTOM_OUTLINE_KEY]
+    }
+    """A dictionary of the detailed outline ids in the rhino doc"""
     tooth_count = -1
 
     # endregion
@@ -65,6 +85,8 @@ class Beam(Component):
                 plane, top_outline, self.neighbor_angles, thickness
             ),
         }
+        self.detailed_outlines = {key: None for key in self.outlines}
+        self.detailed_outline_ids = {key: Guid.Empty for key in self.outlines}
 
         # create volume geometry from top and bottom outline
         self.volume_geometry = self.create_volume_geometry(
@@ -93,6 +115,7 @@ class Beam(Component):
         safety=0.1,
         tooth_count=None,
         flip_direction=False,
+        create_volume=True,
     ):
         """
         Adds sawtooths to the top and bottom outlines, using guides.
@@ -102,6 +125,8 @@ class Beam(Component):
             width (float): The width of the sawtooths
             top_guide (Line): The linear guide at the top
             bottom_guide (Line): The linear guide at the bottom
+            create_volume (bool, optional): Loft the detailed volume from the detailed outlines.
+            Fabrication from 2d outlines does not need it.
         """
 
         # TODO: Check guide direction parallel to first segment
@@ -178,14 +203,16 @@ class Beam(Component):
             )
             start_t = outline_crv.ClosestPoint(divisions[0])[1]
             end_t = outline_crv.ClosestPoint(divisions[-1])[1]
-            split = outline_crv.Split([start_t, end_t])
+            with profiling.measure("split", "beam_sawtooth"):
+                split = outline_crv.Split([start_t, end_t])
             if split.Count != 2:
                 logging.error("Failed to split sawtooth outline")
                 return
             split = sorted(split, key=lambda x: x.GetLength())
-            fillet = rg.Curve.CreateFilletCornersCurve(
-                split[0], toolhead_radius, 0.001, 0.0
-            )
+            with profiling.measure("fillet", "beam_sawtooth"):
+                fillet = rg.Curve.CreateFilletCornersCurve(
+                    split[0], toolhead_radius, 0.001, 0.0
+                )
             if fillet is None:
                 logging.error("Failed to fillet sawtooth outline")
                 return
@@ -208,12 +235,74 @@ class Beam(Component):
             self.settings[TOOLHEAD_RADIUS_KEY],
         )
 
-        volume = algorithms.loft_curves(top_crv, bottom_crv)
+        self.detailed_outlines = {
+            keys.TOP_OUTLINE_KEY: top_crv,
+            keys.BOTTOM_OUTLINE_KEY: bottom_crv,
+        }
 
-        self.detailed_volume_geometry = volume
+        if create_volume:
+            self.detailed_volume_geometry = algorithms.loft_curves(top_crv, bottom_crv)
         # sc.doc.Objects.AddBrep(self.detailed_volume)
         return tooth_count
 
+    def get_detailed_outline(self, key):
+        """
+        Gets the top or bottom outline with sawtooths as a curve,
+        or the simple outline if no sawtooths were added yet.
+        Dowel holes and other boolean details of the volume are not part of it.
+
+        Args:
+            key (str): keys.TOP_OUTLINE_KEY or keys.BOTTOM_OUTLINE_KEY
+
+        Returns:
+            Curve: The outline curve, or None if the beam has sawtooths,
+            but no detailed outline is stored
+        """
+
+        detailed = self.detailed_outlines.get(key)
+        if detailed is not None:
+            return detailed
+
+        # beams detailed before the outlines were stored only have a detailed volume
+        if self.detailed_volume_id != Guid.Empty:
+            logging.error(
+                "Beam {} has sawtooths, but no detailed {}".format(self.identifier, key)
+            )
+            return
+
+        return self.outlines[key].as_curve()
+
+    def create_and_set_detail_geometry(self):
+        """
+        Lofts the detailed volume from the detailed outlines again,
+        which drops all boolean details of the volume
+        """
+
+        top_crv = self.get_detailed_outline(keys.TOP_OUTLINE_KEY)
+        bottom_crv = self.get_detailed_outline(keys.BOTTOM_OUTLINE_KEY)
+        if top_crv is None or bottom_crv is None:
+            return
+
+        self.detailed_volume_geometry = self.create_detailed_geometry(
+            top_crv, bottom_crv
+        )
+
+    def reset_detailed_geometry(self, create_volume=True):
+        """
+        Removes all sawtooths from the detailed outlines and volume.
+        The detailed object ids are kept, so the next serialize replaces them.
+
+        Args:
+            create_volume (bool, optional): Reset the detailed volume, too
+        """
+
+        self.detailed_outlines = {
+            key: outline.as_curve() for key, outline in self.outlines.items()
+        }
+
+        if create_volume:
+            self.detailed_volume_geometry = self.volume_geometry.Duplicate()
+
     @staticmethod
     def create_volume_geometry(top_outline, bottom_outline):
         return algorithms.loft_outlines(top_outline, bottom_outline)
@@ -229,37 +318,34 @@ class Beam(Component):
         if doc is None:
             doc = sc.doc
 
-        self = super(Beam, cls).deserialize(group_index, doc)
+        # get group members for given index
+        members = serde.GroupMembers(group_index, doc)
 
-        # find out what identifier we are working with
-        identifier = doc.Groups.GroupName(group_index)
-        if identifier is None:
+        self = super(Beam, cls).deserialize(group_index, doc, members)
+        if self is None:
             return
 
-        # get group members for given index
-        members = doc.Groups.GroupMembers(group_index)
-
-        # get the outlines
-        outlines = [
-            member
-            for member in members
-            if member.ObjectType == Rhino.DocObjects.ObjectType.Curve
-        ]
-        self.outlines = {
-            outline.Name: ClosedPolyline(outline.Geometry.ToPolyline())
-            for outline in outlines
+        # only read the ids, the geometry is loaded on first access
+        curves = members.of_type(Rhino.DocObjects.ObjectType.Curve)
+        self.outline_ids = {
+            curve.Name: curve.Id
+            for curve in curves
+            if not curve.Name.startswith(DETAILED_OUTLINE_PREFIX)
         }
-        self.outline_ids = {outline.Name: outline.Id for outline in outlines}
 
-        # get the volumes
-        volume_obj = serde.find_named_obj(members, "volume_geometry")
+        self.detailed_outline_ids = {key: Guid.Empty for key in self.outline_ids}
+        for curve in curves:
+            if not curve.Name.startswith(DETAILED_OUTLINE_PREFIX):
+                continue
+            key = curve.Name[len(DETAILED_OUTLINE_PREFIX) :]
+            self.detailed_outline_ids[key] = curve.Id
+
+        volume_obj = members.named("volume_geometry")
         if volume_obj is not None:
-            self.volume_geometry = volume_obj.Geometry
             self.volume_id = volume_obj.Id
 
-        detailed_volume_obj = serde.find_named_obj(members, "detailed_volume_geometry")
+        detailed_volume_obj = members.named("detailed_volume_geometry")
         if detailed_volume_obj is not None:
-            self.detailed_volume_geometry = detailed_volume_obj.Geometry
             self.detailed_volume_id = detailed_volume_obj.Id
 
         return self
@@ -287,6 +373,7 @@ class Beam(Component):
         )
 
         # serialize outlines
+        outline_ids = dict(self.outline_ids)
         for key in self.outlines:
             if self.outlines[key] is None:
                 continue
@@ -295,9 +382,35 @@ class Beam(Component):
                 outline_layer_index,
                 doc,
                 key,
-                self.outline_ids[key],
+                outline_ids[key],
             )
+            outline_ids[key] = id
             assembly_ids.append(id)
+        self.outline_ids = outline_ids
+
+        # get or create a child layer for the detailed outlines
+        detailed_outline_layer_index = serde.add_or_find_layer(
+            self._child_layer_name("detailed_outlines"),
+            doc,
+            serde.DETAIL_COLOR,
+            parent,
+        )
+
+        # serialize detailed outlines, keeping their ids so the next serialize replaces them
+        detailed_outline_ids = dict(self.detailed_outline_ids)
+        for key in self.detailed_outlines:
+            if self.detailed_outlines[key] is None:
+                continue
+            id = serde.serialize_geometry(
+                self.detailed_outlines[key],
+                detailed_outline_layer_index,
+                doc,
+                DETAILED_OUTLINE_PREFIX + key,
+                detailed_outline_ids.get(key, Guid.Empty),
+            )
+            detailed_outline_ids[key] = id
+            assembly_ids.append(id)
+        self.detailed_outline_ids = detailed_outline_ids
 
         # get or create a child layer for the volume geo
         volume_layer_index = serde.add_or_find_layer(
@@ -313,6 +426,7 @@ class Beam(Component):
                 name="volume_geometry",
                 old_id=self.volume_id,
             )
+            self.volume_id = id
             assembly_ids.append(id)
 
         # serialize detailed volume geo
@@ -327,6 +441,7 @@ class Beam(Component):
                 "detailed_volume_geometry",
                 self.detailed_volume_id,
             )
+            self.detailed_volume_id = id
             assembly_ids.append(id)
 
         # add serialized geo as a group
@@ -340,6 +455,10 @@ class Beam(Component):
         for outline in self.outlines.values():
             outline.Transform(xform)
 
+        for outline in self.detailed_outlines.values():
+            if outline is not None:
+                outline.Transform(xform)
+
         if self.volume_geometry:
             self.volume_geometry.Transform(xform)
 
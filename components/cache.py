@@ -0,0 +1,144 @@
+from collections import OrderedDict
+
+"""
+Module that exposes the component cache of the repository.
+Every document gets it's own cache, which is bounded by a number of entries.
+"""
+
+DEFAULT_MAX_ENTRIES = 2000
+"""The default number of components kept per document"""
+
+
+class ComponentCache(object):
+    """
+    A least recently used cache of deserialized components, by group index.
+    Clean components are evicted once the cache holds more than `max_entries`.
+    Dirty components hold changes that are not serialized yet,
+    so they are pinned until they are marked clean again.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries (int, optional): The number of components to keep,
+            None keeps all of them
+        """
+
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__entries = OrderedDict()
+        """The cached components, least recently used first"""
+        self.__dirty = set()
+        """The group indices of all pinned components"""
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, group_index):
+        return group_index in self.__entries
+
+    def get(self, group_index):
+        """
+        Gets the cached component and marks it as recently used
+
+        Returns:
+            Component: The component, or None if it is not cached
+        """
+
+        component = self.__entries.pop(group_index, None)
+        if component is None:
+            self.misses += 1
+            return
+
+        self.__entries[group_index] = component
+        self.hits += 1
+        return component
+
+    def put(self, group_index, component, dirty=False):
+        """
+        Caches the component as most recently used, evicting clean components if needed
+        """
+
+        self.__entries.pop(group_index, None)
+        self.__entries[group_index] = component
+        if dirty:
+            self.__dirty.add(group_index)
+
+        self.__evict()
+
+    def pop(self, group_index):
+        """
+        Removes the component from the cache, even if it is dirty
+
+        Returns:
+            Component: The removed component, or None if it was not cached
+        """
+
+        self.__dirty.discard(group_index)
+        return self.__entries.pop(group_index, None)
+
+    def mark_dirty(self, group_index):
+        if group_index in self.__entries:
+            self.__dirty.add(group_index)
+
+    def mark_clean(self, group_index):
+        self.__dirty.discard(group_index)
+        self.__evict()
+
+    def is_dirty(self, group_index):
+        return group_index in self.__dirty
+
+    def dirty_items(self):
+        """
+        Gets all pinned components
+
+        Returns:
+            list[(int, Component)]: The group indices and components
+        """
+
+        return [(gid, self.__entries[gid]) for gid in self.__dirty]
+
+    def items(self):
+        return list(self.__entries.items())
+
+    def clear(self):
+        self.__entries.clear()
+        self.__dirty.clear()
+
+    def stats(self):
+        """
+        Gets the usage statistics of the cache
+
+        Returns:
+            dict: The entry, dirty, hit, miss and eviction counts
+        """
+
+        return {
+            "entries": len(self.__entries),
+            "dirty": len(self.__dirty),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __evict(self):
+        if self.max_entries is None:
+            return
+
+        overflow = len(self.__entries) - self.max_entries
+        if overflow <= 0:
+            return
+
+        evicted = []
+        for gid in self.__entries:
+            if len(evicted) == overflow:
+                break
+            if gid not in self.__dirty:
+                evicted.append(gid)
+
+        for gid in evicted:
+            del self.__entries[gid]
+        self.evictions += len(evicted)
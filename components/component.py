@@ -7,8 +7,55 @@ import Rhino
 import Rhino.Geometry as rg
 import Rhino.Collections as rc
 from helpers import serde
+from helpers.settings import SettingsMap
 from System import Guid
-import copy
+
+
+class LazyGeometry(object):
+    """
+    Class level default of a geometry attribute, which deserialized components
+    only load from their document on first access, by the ids stored in another attribute.
+    The ids may be a single id, or a (nested) dictionary of ids.
+    Once loaded or assigned, the instance attribute hides this default.
+    """
+
+    def __init__(self, name, ids_name, convert=None, default=None):
+        """
+        Args:
+            name (str): The name of the attribute, the loaded value is stored under it
+            ids_name (str): The name of the attribute holding the document ids
+            convert (callable, optional): Converts every loaded geometry, e.g. to a ClosedPolyline
+            default (optional): The value for components that were not deserialized
+        """
+
+        self.name = name
+        self.ids_name = ids_name
+        self.convert = convert
+        self.default = default
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self.default
+
+        doc = instance.__dict__.get("_source_doc")
+        if doc is None:
+            return self.default
+
+        value = self.__load(getattr(instance, self.ids_name), doc)
+        instance.__dict__[self.name] = value
+        return value
+
+    def __load(self, ids, doc):
+        if isinstance(ids, dict):
+            return {key: self.__load(value, doc) for key, value in ids.items()}
+
+        if ids is None or ids == Guid.Empty:
+            return None
+
+        geometry = serde.find_geometry(ids, doc)
+        if geometry is None or self.convert is None:
+            return geometry
+        return self.convert(geometry)
 
 
 class Component(object):
@@ -23,6 +70,8 @@ class Component(object):
     """The id of the identifier label in the rhino doc"""
     settings = {}
     """All possible geometry settings. Child classes can do whatever here"""
+    _source_doc = None
+    """The document a deserialized component loads it's `LazyGeometry` attributes from"""
 
     def __init__(self, identifier, plane):
         label = rg.TextEntity.Create(
@@ -33,6 +82,7 @@ class Component(object):
 
         self.label = label
         self.label_id = None
+        self.settings = SettingsMap()
 
     @property
     def identifier(self):
@@ -43,10 +93,11 @@ class Component(object):
         return self.label.Plane
 
     @classmethod
-    def deserialize(cls, group_index, doc=None):
+    def deserialize(cls, group_index, doc=None, members=None):
         """
         Deserializes label geometry and settings.
-        Child classes need to make sure to also deserialize their other geometries
+        Child classes need to make sure to also deserialize their other geometries,
+        and should pass their `serde.GroupMembers`, so the group is only read once.
         """
         if doc is None:
             doc = sc.doc
@@ -54,23 +105,26 @@ class Component(object):
         # create a new, empty instance of self
         self = cls.__new__(cls)
 
+        # get group members for given index
+        if members is None:
+            members = serde.GroupMembers(group_index, doc)
+
         # find out what identifier we are working with
-        identifier = doc.Groups.GroupName(group_index)
-        if identifier is None:
+        if members.identifier is None:
             return
 
-        # get group members for given index
-        members = doc.Groups.GroupMembers(group_index)
-
         # get the label object
-        label_obj = [member for member in members if member.Name == identifier][0]
+        label_obj = members.label
         self.label = label_obj.Geometry
         self.label_id = label_obj.Id
+        self._source_doc = doc
 
-        # extract properties from label object
-        prop_dict = copy.deepcopy(cls._deserialize_properties(label_obj, doc))
+        # extract properties from label object,
+        # they are freshly read, so the settings can share them without a copy
+        prop_dict = cls._deserialize_properties(label_obj, doc)
         for key, value in prop_dict.items():
             self.__setattr__(key, value)
+        self.settings = SettingsMap(prop_dict)
 
         return self
 
@@ -103,8 +157,9 @@ class Component(object):
             attr_dict = serde.serialize_pydict(properties)
             attrs.UserDictionary.Set(self._PROPERTIES_KEY, attr_dict)
 
-        # serialize label
-        return serde.serialize_geometry_with_attrs(self.label, attrs, doc)
+        # serialize label, keeping its id so the next serialize replaces it
+        self.label_id = serde.serialize_geometry_with_attrs(self.label, attrs, doc)
+        return self.label_id
 
     @classmethod
     def _deserialize_properties(cls, label_obj, doc=None):
@@ -3,14 +3,21 @@ import Rhino
 import Rhino.Geometry as rg
 import Rhino.Collections as rc
 import scriptcontext as sc
-from helpers import serde
+from helpers import serde, keys
+from System import Guid
 from component import Component
-import rhinoscriptsyntax as rs
 
 PLANE_KEY = "plane"
 RADIUS_KEY = "radius"
 HEIGHT_KEY = "height"
 PARENT_KEY = "parent"
+IDENTIFIER_KEY = "identifier"
+
+MATCH_TOLERANCE = 0.001
+"""The distance within which two cylinders occupy the same space"""
+
+_TEMPLATE_VOLUMES = {}
+"""Volume geometries in world space, keyed by (type, radius, height)"""
 
 # TODO: Derive from Component
 class CylinderBase(object):
@@ -31,13 +38,98 @@ class CylinderBase(object):
         else:
             self.parent_identifier = parent_identifier
 
-        self.volume_geometry = self.calculate_rough_volume(plane, radius, height)
+        self.identifier = keys.cylinder_identifier(
+            self._LAYER_NAME, self.parent_identifier, plane, radius, height
+        )
         self.volume_id = None
+        self._volume_geometry = None
+
+    @property
+    def volume_geometry(self):
+        """
+        The volume geometry at the plane of this cylinder.
+        It is only calculated on first access, as the document stores
+        cylinders as instances of a shared definition.
+        """
+        if self._volume_geometry is None:
+            self._volume_geometry = self.volume_at(
+                self.plane, self.radius, self.height
+            )
+        return self._volume_geometry
+
+    @volume_geometry.setter
+    def volume_geometry(self, geo):
+        self._volume_geometry = geo
+
+    @property
+    def definition_name(self):
+        """
+        The name of the instance definition shared by all cylinders
+        of the same type, radius and height
+        """
+        return "{}{}{:g}x{:g}".format(
+            self._LAYER_NAME, serde.SEPERATOR, self.radius, self.height
+        )
+
+    def matches(self, plane, radius, height, tolerance=MATCH_TOLERANCE):
+        """
+        Checks if this cylinder occupies the same space as the given one, within the tolerance.
+        The parent is not compared.
+
+        Args:
+            plane (Plane): The plane of the other cylinder
+            radius (float): The radius of the other cylinder
+            height (float): The height of the other cylinder
+            tolerance (float, optional): The maximum distance of origins, axes and dimensions
+
+        Returns:
+            bool: True if the cylinders match
+        """
+
+        return (
+            abs(self.radius - radius) <= tolerance
+            and abs(self.height - height) <= tolerance
+            and self.plane.Origin.DistanceTo(plane.Origin) <= tolerance
+            and (self.plane.ZAxis - plane.ZAxis).Length <= tolerance
+        )
+
+    def _create_definition_geometry(self):
+        return self.volume_at(rg.Plane.WorldXY, self.radius, self.height)
 
     @staticmethod
     def calculate_rough_volume(plane, radius, height):
         raise NotImplementedError()
 
+    @classmethod
+    def volume_at(cls, plane, radius, height):
+        """
+        Gets the volume geometry for the given dimensions at the given plane.
+        The geometry is only calculated once per type, radius and height
+        in world space, every call returns a transformed duplicate of it.
+
+        Args:
+            plane (Plane): The plane to place the volume at, it will not be changed
+            radius (float): The radius of the cylinder
+            height (float): The height of the cylinder
+
+        Returns:
+            Brep: The volume geometry, or None if it could not be calculated
+        """
+
+        key = (cls._LAYER_NAME, radius, height)
+        template = _TEMPLATE_VOLUMES.get(key)
+        if template is None:
+            template = cls.calculate_rough_volume(
+                rg.Plane(rg.Plane.WorldXY), radius, height
+            )
+            if template is None:
+                return
+            _TEMPLATE_VOLUMES[key] = template
+
+        volume = template.Duplicate()
+        volume.Transform(rg.Transform.PlaneToPlane(rg.Plane.WorldXY, plane))
+        return volume
+
     def serialize(self, doc=None):
         if doc is None:
             doc = sc.doc
@@ -54,6 +146,10 @@ class CylinderBase(object):
             parent,
         )
 
+        # reuse the volume object, if we were serialized before
+        if not self.volume_id:
+            self.volume_id = self._find_existing_volume_id(doc)
+
         # create rhino attributes for the volume layer
         attrs = Rhino.DocObjects.ObjectAttributes()
         attrs.Name = str(self)
@@ -67,13 +163,61 @@ class CylinderBase(object):
         arch_dict.Set(RADIUS_KEY, self.radius)
         arch_dict.Set(HEIGHT_KEY, self.height)
         arch_dict.Set(PARENT_KEY, self.parent_identifier)
+        arch_dict.Set(IDENTIFIER_KEY, self.identifier)
+
+        # get or create the shared definition for our type and dimensions
+        definition_index = serde.add_or_find_instance_definition(
+            self.definition_name,
+            self._create_definition_geometry,
+            volume_layer_id,
+            doc,
+        )
+        if definition_index < 0:
+            logging.error(
+                "Failed to create instance definition {}".format(self.definition_name)
+            )
+            return
+
+        # serialize an instance of the definition at our plane
+        xform = rg.Transform.PlaneToPlane(rg.Plane.WorldXY, self.plane)
+        self.volume_id = serde.serialize_instance_with_attrs(
+            definition_index, xform, attrs, doc
+        )
+        assembly_ids = [self.volume_id]
+
+        # add serialized geo as a group, reusing the existing one
+        return serde.add_named_group(doc, assembly_ids, self.identifier)
+
+    def _find_existing_volume_id(self, doc):
+        """
+        Finds the volume of a cylinder of the same type and parent, which occupies the same space.
+        Identifiers are derived from rounded values, so a matching cylinder can be named differently,
+        in that case this cylinder takes over it's identifier.
+        """
 
-        assembly_ids = [
-            serde.serialize_geometry_with_attrs(self.volume_geometry, attrs, doc)
-        ]
+        group = doc.Groups.FindName(self.identifier)
+        if group is not None:
+            members = doc.Groups.GroupMembers(group.Index)
+            return members[0].Id if members else None
 
-        # TODO: Cylinders will serialize multiple times to new geo, that's bad
-        return doc.Groups.Add(assembly_ids)
+        # imported here, as the repository imports all components
+        from components import repository
+
+        for gid in repository.get_component_ids_by_parent(
+            self.parent_identifier, type(self), doc
+        ):
+            members = doc.Groups.GroupMembers(gid)
+            if not members:
+                continue
+
+            arch_dict = members[0].Attributes.UserDictionary
+            if self.matches(
+                arch_dict.GetPlane(PLANE_KEY),
+                arch_dict.Item[RADIUS_KEY],
+                arch_dict.Item[HEIGHT_KEY],
+            ):
+                self.identifier = doc.Groups.GroupName(gid)
+                return members[0].Id
 
     @classmethod
     def deserialize(cls, group_index, doc=None):
@@ -84,7 +228,7 @@ class CylinderBase(object):
         self = cls.__new__(cls)
 
         # find the volume object from the group index
-        volume_obj = doc.Groups.GroupMembers(group_index)[0]
+        volume_obj = serde.GroupMembers(group_index, doc).objects[0]
 
         # retrieve arch_dict from volume_id
         arch_dict = volume_obj.Attributes.UserDictionary
@@ -96,14 +240,122 @@ class CylinderBase(object):
         ]  # C# number types don't play nice with python number types
         self.height = arch_dict.Item[HEIGHT_KEY]  # So get the element directly instead
         self.volume_id = volume_obj.Id
-        self.volume_geometry = volume_obj.Geometry
+        self.parent_identifier = ""
+
+        # instanced cylinders calculate their geometry lazily,
+        # only documents from before instancing store a full brep
+        if volume_obj.ObjectType == Rhino.DocObjects.ObjectType.InstanceReference:
+            self._volume_geometry = None
+        else:
+            self._volume_geometry = volume_obj.Geometry
         parent_ident = arch_dict.GetString(PARENT_KEY)
         if parent_ident:
             self.parent_identifier = parent_ident
 
+        # cylinders from before stable identifiers have none stored
+        identifier = arch_dict.GetString(IDENTIFIER_KEY)
+        if not identifier:
+            identifier = keys.cylinder_identifier(
+                cls._LAYER_NAME,
+                self.parent_identifier,
+                self.plane,
+                self.radius,
+                self.height,
+            )
+        self.identifier = identifier
+
         return self
 
-    def transform(self, xform):
+    def transform(self, xform, doc=None):
+        """
+        Transforms the cylinder, together with it's volume in the document.
+        The identifier describes the placement, so it is re-calculated
+        and the group is renamed to it.
+        """
 
-        if self.volume_id:
-            rs.TransformObject(self.volume_id, xform)
+        if doc is None:
+            doc = sc.doc
+
+        old_identifier = self.identifier
+        self.plane.Transform(xform)
+        self.identifier = keys.cylinder_identifier(
+            self._LAYER_NAME,
+            self.parent_identifier,
+            self.plane,
+            self.radius,
+            self.height,
+        )
+
+        if self._volume_geometry is not None:
+            self._volume_geometry.Transform(xform)
+
+        if not self.volume_id:
+            return
+
+        doc.Objects.Transform(self.volume_id, xform, True)
+
+        # keep the stored plane and identifier in sync with the transformed instance
+        volume_obj = doc.Objects.FindId(self.volume_id)
+        attrs = volume_obj.Attributes.Duplicate()
+        attrs.UserDictionary.Set(PLANE_KEY, self.plane)
+        attrs.UserDictionary.Set(IDENTIFIER_KEY, self.identifier)
+        doc.Objects.ModifyAttributes(volume_obj, attrs, True)
+
+        group = doc.Groups.FindName(old_identifier)
+        if group is not None and old_identifier != self.identifier:
+            doc.Groups.ChangeGroupName(group.Index, self.identifier)
+
+    @classmethod
+    def transform_groups(cls, group_indices, xform, doc=None):
+        """
+        Transforms the volumes of many cylinders directly in the document,
+        without deserializing them. Stored planes and identifiers are updated
+        and the groups are renamed to the new identifiers.
+
+        Args:
+            group_indices (list[int]): The group indices of the cylinders
+            xform (Transform): The transformation to apply
+            doc (RhinoDoc, optional): The document to transform in
+
+        Returns:
+            list[(int, str, str)]: The group index, old and new identifier of every transformed cylinder
+        """
+
+        if doc is None:
+            doc = sc.doc
+
+        renamed = []
+        for gid in group_indices:
+            members = doc.Groups.GroupMembers(gid)
+            if not members:
+                continue
+
+            volume_id = members[0].Id
+            if doc.Objects.Transform(volume_id, xform, True) == Guid.Empty:
+                logging.error(
+                    "Failed to transform object {} of group {}".format(volume_id, gid)
+                )
+                continue
+
+            volume_obj = doc.Objects.FindId(volume_id)
+            attrs = volume_obj.Attributes.Duplicate()
+            arch_dict = attrs.UserDictionary
+            plane = arch_dict.GetPlane(PLANE_KEY)
+            plane.Transform(xform)
+            identifier = keys.cylinder_identifier(
+                cls._LAYER_NAME,
+                arch_dict.GetString(PARENT_KEY) or "",
+                plane,
+                arch_dict.Item[RADIUS_KEY],
+                arch_dict.Item[HEIGHT_KEY],
+            )
+            arch_dict.Set(PLANE_KEY, plane)
+            arch_dict.Set(IDENTIFIER_KEY, identifier)
+            doc.Objects.ModifyAttributes(volume_obj, attrs, True)
+
+            old_identifier = doc.Groups.GroupName(gid)
+            if old_identifier != identifier:
+                doc.Groups.ChangeGroupName(gid, identifier)
+            renamed.append((gid, old_identifier, identifier))
+
+        return renamed
@@ -0,0 +1,117 @@
+import bisect
+import fnmatch
+import os
+import re
+
+"""
+Module that exposes a sorted index of component identifiers,
+which answers wildcard searches without matching every identifier.
+"""
+
+WILDCARDS = "*?["
+"""The characters that start a wildcard in fnmatch patterns"""
+
+
+def literal_prefix(pattern):
+    """
+    Gets the part of the pattern before the first wildcard
+    """
+
+    for i, char in enumerate(pattern):
+        if char in WILDCARDS:
+            return pattern[:i]
+    return pattern
+
+
+def literal_suffix(pattern):
+    """
+    Gets the part of the pattern after the last wildcard
+    """
+
+    for i in range(len(pattern) - 1, -1, -1):
+        if pattern[i] in WILDCARDS or pattern[i] == "]":
+            return pattern[i + 1 :]
+    return pattern
+
+
+class IdentifierIndex(object):
+    """
+    The group indices of components, sorted by identifier.
+    Identifiers are compared like `fnmatch` does, so case insensitive on windows.
+    A search only matches the identifiers sharing the literal prefix of the pattern,
+    or the literal suffix, whichever is longer.
+    """
+
+    def __init__(self, items=None):
+        """
+        Args:
+            items (list[(str, int)], optional): The identifiers and group indices to index
+        """
+
+        items = [(os.path.normcase(name), gid) for name, gid in items or []]
+        self.__names = sorted(items)
+        """Identifiers and group indices, sorted by identifier"""
+        self.__reversed = sorted((name[::-1], gid) for name, gid in items)
+        """Reversed identifiers and group indices, sorted by reversed identifier"""
+
+    def __len__(self):
+        return len(self.__names)
+
+    @staticmethod
+    def __insert(entries, entry):
+        index = bisect.bisect_left(entries, entry)
+        if index < len(entries) and entries[index] == entry:
+            return
+        entries.insert(index, entry)
+
+    @staticmethod
+    def __remove(entries, entry):
+        index = bisect.bisect_left(entries, entry)
+        if index < len(entries) and entries[index] == entry:
+            del entries[index]
+
+    @staticmethod
+    def __range(entries, prefix):
+        index = bisect.bisect_left(entries, (prefix,))
+        while index < len(entries) and entries[index][0].startswith(prefix):
+            yield entries[index]
+            index += 1
+
+    def add(self, identifier, group_index):
+        name = os.path.normcase(identifier)
+        self.__insert(self.__names, (name, group_index))
+        self.__insert(self.__reversed, (name[::-1], group_index))
+
+    def remove(self, identifier, group_index):
+        name = os.path.normcase(identifier)
+        self.__remove(self.__names, (name, group_index))
+        self.__remove(self.__reversed, (name[::-1], group_index))
+
+    def search(self, pattern):
+        """
+        Finds all identifiers matching the given fnmatch pattern
+
+        Returns:
+            list[int]: The group indices of the matches, in identifier order
+        """
+
+        pattern = os.path.normcase(pattern)
+        regex = re.compile(fnmatch.translate(pattern))
+
+        prefix = literal_prefix(pattern)
+        suffix = literal_suffix(pattern)
+
+        if len(suffix) > len(prefix):
+            matches = sorted(
+                (name[::-1], gid)
+                for name, gid in self.__range(self.__reversed, suffix[::-1])
+                if regex.match(name[::-1])
+            )
+        else:
+            matches = [
+                (name, gid)
+                for name, gid in self.__range(self.__names, prefix)
+                if regex.match(name)
+            ]
+
+        return [gid for _, gid in matches]
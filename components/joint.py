@@ -11,7 +11,6 @@ from helpers.geometry import ClosedPolyline
 from System import Guid
 import math
 import rhinoscriptsyntax as rs
-import copy
 
 MALE_KEY = "male_id"
 FEMALE_KEY = "female_id"
@@ -67,7 +66,7 @@ class JointFactory(object):
                         outlines[-1],
                         panel_a.plane,
                         panel_a.neighbor_angles,
-                        panel_a.settings["beam_thickness"],
+                        panel_a.geometry_settings.beam_thickness,
                     )
                 )
             )
@@ -122,14 +121,14 @@ class Joint(Component):
         return (
             max(
                 [
-                    calc_safety(angle, panel.settings["beam_max_width"])
+                    calc_safety(angle, panel.geometry_settings.beam_max_width)
                     for angle in panel.outline.get_edge_angles(panel.plane, edge_key)
                 ]
             )
             + 10  # hard coded safety offset
         )
 
-    def add_joint_geometry_to_children(self):
+    def add_joint_geometry_to_children(self, create_volumes=True):
         # get the two connected panels
         # male_panel = repo.get_component_by_part_id(self.male_id)
         # female_panel = repo.get_component_by_part_id(self.female_id)
@@ -167,20 +166,19 @@ class Joint(Component):
 
         # get sawtooth settings
         sawtooth_count = None
-        sawtooth_depth = male_panel.settings["sawtooth_depth"]
-        sawtooth_width = male_panel.settings["sawtooth_width"]
+        geometry_settings = male_panel.geometry_settings
+        sawtooth_depth = geometry_settings.sawtooth_depth
+        sawtooth_width = geometry_settings.sawtooth_width
 
         # iterate over beams and add sawtooths
         # TODO: sawtooth code inside of beams is not too hot
         for i, (male_beam, female_beam) in enumerate(zip(male_beams, female_beams)):
 
             # make sure toolhead_radius is set
-            male_beam.settings["toolhead_radius"] = male_panel.settings[
-                "toolhead_radius"
-            ]
-            female_beam.settings["toolhead_radius"] = female_panel.settings[
-                "toolhead_radius"
-            ]
+            male_beam.settings["toolhead_radius"] = geometry_settings.toolhead_radius
+            female_beam.settings["toolhead_radius"] = (
+                female_panel.geometry_settings.toolhead_radius
+            )
 
             sawtooth_count = male_beam.add_sawtooths(
                 sawtooth_depth,
@@ -189,6 +187,7 @@ class Joint(Component):
                 self.guides[level_key(i + 1)],
                 safety,
                 sawtooth_count,
+                create_volume=create_volumes,
             )
             sawtooth_count = female_beam.add_sawtooths(
                 sawtooth_depth,
@@ -198,6 +197,7 @@ class Joint(Component):
                 safety,
                 sawtooth_count,
                 flip_direction=True,
+                create_volume=create_volumes,
             )
 
         self.settings["sawtooth_count"] = sawtooth_count
@@ -245,8 +245,9 @@ class Joint(Component):
         # get sawtooth settings
         # sawtooth_count = self.settings["sawtooth_count"]
         sawtooth_count = self.tooth_count
-        sawtooth_depth = male_panel.settings["sawtooth_depth"]
-        sawtooth_width = male_panel.settings["sawtooth_width"]
+        geometry_settings = male_panel.geometry_settings
+        sawtooth_depth = geometry_settings.sawtooth_depth
+        sawtooth_width = geometry_settings.sawtooth_width
 
         # add detailed outlines to plates
         # self, edge_key, depth, width, safety, tooth_count, flip_direction
@@ -268,6 +269,8 @@ class Joint(Component):
         )
 
         # update male and female plate in document
+        repo.mark_dirty(male_plate)
+        repo.mark_dirty(female_plate)
         repo.commit_changes()
 
         return frozenset([male_plate.label_id, female_plate.label_id])
@@ -279,27 +282,19 @@ class Joint(Component):
         if doc is None:
             doc = sc.doc
 
-        # find out what identifier we are working with
-        identifier = doc.Groups.GroupName(group_index)
-        if identifier is None:
-            return
-
         # get group members for given index
-        members = doc.Groups.GroupMembers(group_index)
+        members = serde.GroupMembers(group_index, doc)
 
         # deserialize label and props
-        self = super(Joint, cls).deserialize(group_index, doc)
-        self.settings = copy.deepcopy(self.settings)
+        self = super(Joint, cls).deserialize(group_index, doc, members)
+        if self is None:
+            return
         tooth_count = rs.GetUserText(self.label_id, "sawtooth_count")
         if tooth_count:
             self.tooth_count = int(tooth_count)
 
         # get the guides
-        guide_objs = [
-            member
-            for member in members
-            if member.ObjectType == Rhino.DocObjects.ObjectType.Curve
-        ]
+        guide_objs = members.of_type(Rhino.DocObjects.ObjectType.Curve)
         self.guides = {}
         self.guide_ids = {}
         for guide_obj in guide_objs:
@@ -334,15 +329,18 @@ class Joint(Component):
         )
 
         # serialize outlines
+        guide_ids = dict(self.guide_ids)
         for key in self.guides:
             id = serde.serialize_geometry(
                 self.guides[key].ToNurbsCurve(),
                 guide_layer_index,
                 doc,
                 name=key,
-                old_id=self.guide_ids[key],
+                old_id=guide_ids.get(key, Guid.Empty),
             )
+            guide_ids[key] = id
             assembly_ids.append(id)
+        self.guide_ids = guide_ids
 
         # add serialized geo as a group
         return serde.add_named_group(doc, assembly_ids, self.identifier)
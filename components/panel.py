@@ -1,6 +1,6 @@
 from components.component import Component
 import logging
-from helpers import algorithms, serde, keys
+from helpers import algorithms, serde, keys, settings
 from helpers.geometry import ClosedPolyline
 import Rhino.Geometry as rg
 import Rhino
@@ -11,6 +11,7 @@ import rhinoscriptsyntax as rs
 NEIGHBOR_IDS_KEY = "neighbor_ids"
 NEIGHBOR_ANGLES_KEY = "neighbor_angles"
 INDEX_KEY = "panel_index"
+SETTINGS_PROFILE_KEY = "settings_profile"
 
 
 class Panel(Component):
@@ -105,6 +106,16 @@ class Panel(Component):
 
     # endregion
 
+    @property
+    def geometry_settings(self):
+        """
+        The validated geometry settings of the panel, hashable so they can key caches
+
+        Returns:
+            GeometrySettings: The settings
+        """
+        return settings.GeometrySettings.from_mapping(self.settings)
+
     # region Read/Write
 
     @classmethod
@@ -115,39 +126,35 @@ class Panel(Component):
         # create a new, empty instance of self
         self = cls.__new__(cls)
 
+        # get group members for given index
+        members = serde.GroupMembers(group_index, doc)
+
         # find out what identifier we are working with
-        identifier = doc.Groups.GroupName(group_index)
-        if identifier is None:
+        if members.identifier is None:
             return
 
-        # get group members for given index
-        members = doc.Groups.GroupMembers(group_index)
-
         # get the label object
-        label_obj = [member for member in members if member.Name == identifier][0]
+        label_obj = members.label
         self.label = label_obj.Geometry
         self.label_id = label_obj.Id
 
         # extract properties from label object
         prop_dict = cls._deserialize_properties(label_obj, doc)
+        profile_id = prop_dict.pop(SETTINGS_PROFILE_KEY, None)
         for key, value in prop_dict.items():
             self.__setattr__(key, value)
 
+        # the stored settings only hold the overrides of the profile
+        if profile_id is not None:
+            self.settings = settings.profile_settings(profile_id, self.settings, doc)
+
         # get the outline
-        outline_obj = [
-            member
-            for member in members
-            if member.ObjectType == Rhino.DocObjects.ObjectType.Curve
-        ][0]
+        outline_obj = members.of_type(Rhino.DocObjects.ObjectType.Curve)[0]
         self.outline = ClosedPolyline(outline_obj.Geometry.ToPolyline())
         self.outline_id = outline_obj.Id
 
         # get the volume
-        surface_obj = [
-            member
-            for member in members
-            if member.ObjectType == Rhino.DocObjects.ObjectType.Brep
-        ][0]
+        surface_obj = members.of_type(Rhino.DocObjects.ObjectType.Brep)[0]
         self.panel_id = surface_obj.Id
 
         return self
@@ -177,6 +184,7 @@ class Panel(Component):
             doc,
             old_id=self.outline_id,
         )
+        self.outline_id = id
         assembly_ids.append(id)
 
         # get or create a child layer for the outlines
@@ -205,12 +213,15 @@ class Panel(Component):
         )
 
         # create a dict of all properties to serialize
+        profile_id, panel_settings = settings.serialize_settings(self.settings, doc)
         prop_dict = {
             NEIGHBOR_IDS_KEY: self.neighbor_ids,
             NEIGHBOR_ANGLES_KEY: self.neighbor_angles,
             INDEX_KEY: self.panel_index,
-            "settings": self.settings,
+            "settings": panel_settings,
         }
+        if profile_id is not None:
+            prop_dict[SETTINGS_PROFILE_KEY] = profile_id
 
         # serialize label
         id = self._serialize_label(label_layer_index, doc, prop_dict)
@@ -221,6 +232,14 @@ class Panel(Component):
 
     # endregion
 
+    @property
+    def fabrication_transform(self):
+        """
+        The transformation from the panel plane to world xy,
+        which lays the whole cassette flat for fabrication
+        """
+        return rg.Transform.PlaneToPlane(self.plane, rg.Plane.WorldXY)
+
     def transform(self, xform):
 
         # call transform on parent class
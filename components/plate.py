@@ -7,7 +7,8 @@ import helpers.keys as keys
 import logging
 import helpers.serde as serde
 import helpers.algorithms as algorithms
-from components.component import Component
+from helpers import profiling
+from components.component import Component, LazyGeometry
 from System import Guid
 
 
@@ -16,13 +17,22 @@ class Plate(Component):
 
     _LABEL_HEIGHT = 0.1
     _LAYER_NAME = "Plate"
-    outlines = {keys.TOP_OUTLINE_KEY: None, keys.BOTTOM_OUTLINE_KEY: None}
-    outline_ids = {key: Guid.Empty for key in outlines}
-    volume_geometry = None
+    outlines = LazyGeometry(
+        "outlines",
+        "outline_ids",
+        lambda curve: ClosedPolyline(curve.ToPolyline()),
+        {keys.TOP_OUTLINE_KEY: None, keys.BOTTOM_OUTLINE_KEY: None},
+    )
+    outline_ids = {
+        key: Guid.Empty for key in [keys.TOP_OUTLINE_KEY, keys.BOTTOM_OUTLINE_KEY]
+    }
+    volume_geometry = LazyGeometry("volume_geometry", "volume_id")
     volume_id = Guid.Empty
-    detailed_edges = None
+    detailed_edges = LazyGeometry("detailed_edges", "detailed_edge_ids")
     detailed_edge_ids = None
-    detailed_volume_geometry = None
+    detailed_volume_geometry = LazyGeometry(
+        "detailed_volume_geometry", "detailed_volume_id"
+    )
     detailed_volume_id = Guid.Empty
 
     # endregion
@@ -59,24 +69,52 @@ class Plate(Component):
     def create_volume_geometry(top_outline, bottom_outline):
         return algorithms.loft_outlines(top_outline, bottom_outline)
 
-    def create_and_set_detail_geometry(self):
-        def join_outline(edge_dict):
-            joined = rg.Curve.JoinCurves(edge_dict.values())
-            if joined.Count != 1:
-                logging.error("Failed to join detail outline")
+    def get_detailed_outline(self, key):
+        """
+        Joins the detailed edges of the top or bottom outline,
+        or gets the simple outline if the plate has no detailed edges.
+        Cutouts, dowel holes and other boolean details of the volume are not part of it.
+
+        Args:
+            key (str): keys.TOP_OUTLINE_KEY or keys.BOTTOM_OUTLINE_KEY
+
+        Returns:
+            Curve: The joined outline, or None if joining failed,
+            or the plate has sawtooths but no detailed edges are stored
+        """
+
+        if not self.detailed_edges:
+            # the detailed volume is only created from sawtooth edges
+            if self.detailed_volume_id != Guid.Empty:
+                logging.error(
+                    "Plate {} has sawtooths, but no detailed edges".format(
+                        self.identifier
+                    )
+                )
                 return
-            return joined[0]
 
-        top_detail_crv = join_outline(self.detailed_edges.get(keys.TOP_OUTLINE_KEY))
-        bottom_detail_crv = join_outline(
-            self.detailed_edges.get(keys.BOTTOM_OUTLINE_KEY)
-        )
+            return self.outlines[key].as_curve()
+
+        joined = rg.Curve.JoinCurves(self.detailed_edges.get(key).values())
+        if joined.Count != 1:
+            logging.error("Failed to join detail outline")
+            return
+        return joined[0]
+
+    def create_and_set_detail_geometry(self):
+        top_detail_crv = self.get_detailed_outline(keys.TOP_OUTLINE_KEY)
+        bottom_detail_crv = self.get_detailed_outline(keys.BOTTOM_OUTLINE_KEY)
 
         self.detailed_volume_geometry = algorithms.loft_curves(
             top_detail_crv, bottom_detail_crv
         )
 
     def reset_detailed_edges(self):
+        """
+        Replaces all detailed edges with the plain outline edges.
+        Ids of already serialized edges are kept, so the next serialize replaces them.
+        """
+
         top_outline = self.outlines.get(keys.TOP_OUTLINE_KEY)
         bottom_outline = self.outlines.get(keys.BOTTOM_OUTLINE_KEY)
         self.detailed_edges = {
@@ -90,13 +128,13 @@ class Plate(Component):
             },
         }
 
+        old_ids = self.detailed_edge_ids or {}
         self.detailed_edge_ids = {
-            keys.TOP_OUTLINE_KEY: {
-                key: Guid.Empty for key in self.detailed_edges[keys.TOP_OUTLINE_KEY]
-            },
-            keys.BOTTOM_OUTLINE_KEY: {
-                key: Guid.Empty for key in self.detailed_edges[keys.BOTTOM_OUTLINE_KEY]
-            },
+            level_key: {
+                key: old_ids.get(level_key, {}).get(key, Guid.Empty)
+                for key in self.detailed_edges[level_key]
+            }
+            for level_key in self.detailed_edges
         }
 
     def create_detailed_edge(
@@ -163,14 +201,16 @@ class Plate(Component):
 
             start_t = edge_crv.ClosestPoint(divisions[0])[1]
             end_t = edge_crv.ClosestPoint(divisions[-1])[1]
-            split = edge_crv.Split([start_t, end_t])
+            with profiling.measure("split", "plate_sawtooth"):
+                split = edge_crv.Split([start_t, end_t])
             if split.Count != 3:
                 logging.error("Failed to split sawtooth outline")
                 return
             split = sorted(split, key=lambda x: x.GetLength())
-            fillet = rg.Curve.CreateFilletCornersCurve(
-                split[-1], toolhead_radius, 0.001, 0.0
-            )
+            with profiling.measure("fillet", "plate_sawtooth"):
+                fillet = rg.Curve.CreateFilletCornersCurve(
+                    split[-1], toolhead_radius, 0.001, 0.0
+                )
             if fillet is None:
                 logging.error("Failed to fillet sawtooth outline")
                 return
@@ -214,62 +254,37 @@ class Plate(Component):
         if doc is None:
             doc = sc.doc
 
-        # find out what identifier we are working with
-        identifier = doc.Groups.GroupName(group_index)
-        if identifier is None:
-            return
-
         # get group members for given index
-        members = doc.Groups.GroupMembers(group_index)
+        members = serde.GroupMembers(group_index, doc)
 
         # deserialize label and settings
-        self = super(Plate, cls).deserialize(group_index, doc)
-
-        # get the outlines
-        outlines = [
-            member
-            for member in members
-            if member.ObjectType == Rhino.DocObjects.ObjectType.Curve
-            and (
-                member.Name == keys.TOP_OUTLINE_KEY
-                or member.Name == keys.BOTTOM_OUTLINE_KEY
-            )
-        ]
+        self = super(Plate, cls).deserialize(group_index, doc, members)
+        if self is None:
+            return
 
-        self.outlines = {
-            outline.Name: ClosedPolyline(outline.Geometry.ToPolyline())
-            for outline in outlines
+        # only read the ids, the geometry is loaded on first access
+        curves = members.of_type(Rhino.DocObjects.ObjectType.Curve)
+        outline_keys = [keys.TOP_OUTLINE_KEY, keys.BOTTOM_OUTLINE_KEY]
+        self.outline_ids = {
+            curve.Name: curve.Id for curve in curves if curve.Name in outline_keys
         }
-        self.outline_ids = {outline.Name: outline.Id for outline in outlines}
-
-        detailed_edges = [
-            member
-            for member in members
-            if member.ObjectType == Rhino.DocObjects.ObjectType.Curve
-            and (
-                member.Name != keys.BOTTOM_OUTLINE_KEY
-                and member.Name != keys.TOP_OUTLINE_KEY
-            )
-        ]
+
+        detailed_edges = [curve for curve in curves if curve.Name not in outline_keys]
         if detailed_edges:
-            self.detailed_edges = {
+            self.detailed_edge_ids = {
                 keys.TOP_OUTLINE_KEY: {},
                 keys.BOTTOM_OUTLINE_KEY: {},
             }
-            self.detailed_edge_ids = {key: {} for key in self.detailed_edges}
             for edge in detailed_edges:
                 level_key, edge_key = edge.Name.split("|")
-                self.detailed_edges[level_key][edge_key] = edge.Geometry
                 self.detailed_edge_ids[level_key][edge_key] = edge.Id
 
-        volume_obj = serde.find_named_obj(members, "volume_geometry")
+        volume_obj = members.named("volume_geometry")
         if volume_obj is not None:
-            self.volume_geometry = volume_obj.Geometry
             self.volume_id = volume_obj.Id
 
-        detailed_volume_obj = serde.find_named_obj(members, "detailed_volume_geometry")
+        detailed_volume_obj = members.named("detailed_volume_geometry")
         if detailed_volume_obj is not None:
-            self.detailed_volume_geometry = detailed_volume_obj.Geometry
             self.detailed_volume_id = detailed_volume_obj.Id
 
         return self
@@ -296,24 +311,32 @@ class Plate(Component):
         )
 
         # serialize outlines
+        outline_ids = dict(self.outline_ids)
         for key in self.outlines:
             id = serde.serialize_geometry(
                 self.outlines[key].as_curve(),
                 outline_layer_index,
                 doc,
                 key,
-                self.outline_ids[key],
+                outline_ids[key],
             )
+            outline_ids[key] = id
             assembly_ids.append(id)
+        self.outline_ids = outline_ids
 
         detailed_edges_layer_index = serde.add_or_find_layer(
             self._child_layer_name("detailed_edges"), doc, serde.DETAIL_COLOR, parent
         )
 
+        detailed_edge_ids = {
+            level_key: dict(ids)
+            for level_key, ids in (self.detailed_edge_ids or {}).items()
+        }
         for level_key in self.detailed_edges:
             edges = self.detailed_edges.get(level_key)
             if not edges:
                 continue
+            level_ids = detailed_edge_ids.setdefault(level_key, {})
             for edge_key in edges:
                 if edges[edge_key] is None:
                     continue
@@ -322,9 +345,11 @@ class Plate(Component):
                     detailed_edges_layer_index,
                     doc,
                     "{}|{}".format(level_key, edge_key),
-                    self.detailed_edge_ids[level_key][edge_key],
+                    level_ids.get(edge_key, Guid.Empty),
                 )
+                level_ids[edge_key] = id
                 assembly_ids.append(id)
+        self.detailed_edge_ids = detailed_edge_ids
 
         # get or create a child layer for the volume geo
         volume_layer_index = serde.add_or_find_layer(
@@ -339,6 +364,7 @@ class Plate(Component):
             name="volume_geometry",
             old_id=self.volume_id,
         )
+        self.volume_id = id
         assembly_ids.append(id)
 
         # serialize detailed volume geo
@@ -353,6 +379,7 @@ class Plate(Component):
                 "detailed_volume_geometry",
                 old_id=self.detailed_volume_id,
             )
+            self.detailed_volume_id = id
             assembly_ids.append(id)
 
         # add serialized geo as a group
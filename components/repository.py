@@ -2,17 +2,211 @@ try:
     import scriptcontext as sc
 except:
     import inside_doc as sc
+import contextlib
 import logging
+import Rhino
 import components
-from helpers import keys, serde
-import fnmatch
+from components import cache, cylinder_base, identifier_index
+from helpers import keys, profiling, serde
+from System import Guid
 
 TYPE_KEY = "type"
+PARENT_KEY = "parent"
 
 # TODO: How can we expose this to component instances?
 # Pythons wonderful circular import block makes this rather hard..
 
-__GID_COMPONENT_MAPPER = {}
+__COMPONENT_CACHES = {}
+"""Per document caches of deserialized components"""
+
+__CACHE_SETTINGS = {"max_entries": cache.DEFAULT_MAX_ENTRIES}
+
+__PARENT_INDICES = {}
+"""Per document indices of parent identifiers to child group indices"""
+
+__TYPE_INDICES = {}
+"""Per document indices of component type names to group indices"""
+
+__IDENTIFIER_INDICES = {}
+"""Per document sorted indices of identifiers to group indices"""
+
+__CASSETTE_INDICES = {}
+"""Per document indices of panel identifiers to their cassette parts"""
+
+CASSETTE_TYPES = [
+    components.extract_classname(component_type)
+    for component_type in [components.Plate, components.SkeletonPart, components.Beam]
+]
+"""The type names of the cassette parts, in the order a cassette is read"""
+
+EVENTS_STICKY_KEY = "p7_repository_event_handlers"
+"""The sticky key of the subscribed document event handlers, kept across script runs"""
+
+__EVENT_STATE = {"suspended": 0}
+
+
+def __get_cache(doc):
+    component_cache = __COMPONENT_CACHES.get(doc.RuntimeSerialNumber)
+    if component_cache is None:
+        component_cache = cache.ComponentCache(__CACHE_SETTINGS["max_entries"])
+        __COMPONENT_CACHES[doc.RuntimeSerialNumber] = component_cache
+
+    return component_cache
+
+
+def configure_cache(max_entries):
+    """
+    Sets the number of components kept per document,
+    for existing and new document caches
+
+    Args:
+        max_entries (int): The maximum entry count, None for an unbounded cache
+    """
+
+    __CACHE_SETTINGS["max_entries"] = max_entries
+    for component_cache in __COMPONENT_CACHES.values():
+        component_cache.max_entries = max_entries
+
+
+def get_cache_stats(doc=None):
+    """
+    Gets the hit, miss and eviction statistics of the component cache of a document
+
+    Returns:
+        dict: See `ComponentCache.stats`
+    """
+
+    if doc is None:
+        doc = sc.doc
+
+    return __get_cache(doc).stats()
+
+
+@contextlib.contextmanager
+def __own_changes():
+    """
+    Ignores all document events while the repository changes the document itself
+    """
+
+    __EVENT_STATE["suspended"] += 1
+    try:
+        yield
+    finally:
+        __EVENT_STATE["suspended"] -= 1
+
+
+def __invalidate_object(obj):
+    if __EVENT_STATE["suspended"] or obj is None:
+        return
+
+    component_cache = __COMPONENT_CACHES.get(obj.Document.RuntimeSerialNumber)
+    if component_cache is None:
+        return
+
+    # group members know their groups, so only the affected components are dropped
+    for gid in obj.Attributes.GetGroupList() or []:
+        component_cache.pop(gid)
+
+
+def __on_object_event(sender, e):
+    __invalidate_object(e.TheObject)
+
+
+def __on_replace_object(sender, e):
+    __invalidate_object(e.OldRhinoObject)
+
+
+def __on_group_event(sender, e):
+    if __EVENT_STATE["suspended"]:
+        return
+
+    serial_number = e.Document.RuntimeSerialNumber
+    if e.EventType == Rhino.DocObjects.Tables.GroupTableEventType.Modified:
+        component_cache = __COMPONENT_CACHES.get(serial_number)
+        if component_cache is not None:
+            component_cache.pop(e.GroupIndex)
+
+        # the group might have been renamed
+        __IDENTIFIER_INDICES.pop(serial_number, None)
+        return
+
+    # added, deleted or sorted groups may change any index
+    __COMPONENT_CACHES.pop(serial_number, None)
+    __drop_indices(serial_number)
+
+
+def __on_undo_redo(sender, e):
+    # undone objects raise their own events, but group names and user strings do not
+    if e.IsEndUndo or e.IsEndRedo:
+        __drop_indices()
+
+
+def __on_close_document(sender, e):
+    __COMPONENT_CACHES.pop(e.Document.RuntimeSerialNumber, None)
+    __drop_indices(e.Document.RuntimeSerialNumber)
+
+
+def __drop_indices(serial_number=None):
+    """
+    Drops the group indices of the given document, or of all documents.
+    They are rebuilt on their next use.
+    """
+
+    for indices in [
+        __PARENT_INDICES,
+        __TYPE_INDICES,
+        __IDENTIFIER_INDICES,
+        __CASSETTE_INDICES,
+    ]:
+        if serial_number is None:
+            indices.clear()
+        else:
+            indices.pop(serial_number, None)
+
+
+def subscribe_events():
+    """
+    Subscribes to the document events that invalidate cached components.
+    Handlers of earlier script runs are unsubscribed first,
+    so there is only ever one set of handlers.
+    """
+
+    unsubscribe_events()
+
+    Rhino.RhinoDoc.AddRhinoObject += __on_object_event
+    Rhino.RhinoDoc.DeleteRhinoObject += __on_object_event
+    Rhino.RhinoDoc.UndeleteRhinoObject += __on_object_event
+    Rhino.RhinoDoc.ReplaceRhinoObject += __on_replace_object
+    Rhino.RhinoDoc.GroupTableEvent += __on_group_event
+    Rhino.RhinoDoc.CloseDocument += __on_close_document
+    Rhino.Commands.Command.UndoRedo += __on_undo_redo
+
+    sc.sticky[EVENTS_STICKY_KEY] = (
+        __on_object_event,
+        __on_replace_object,
+        __on_group_event,
+        __on_close_document,
+        __on_undo_redo,
+    )
+
+
+def unsubscribe_events():
+    """
+    Unsubscribes the document event handlers, the cache is not invalidated anymore
+    """
+
+    handlers = sc.sticky.pop(EVENTS_STICKY_KEY, None)
+    if handlers is None:
+        return
+
+    on_object, on_replace, on_group, on_close, on_undo_redo = handlers
+    Rhino.RhinoDoc.AddRhinoObject -= on_object
+    Rhino.RhinoDoc.DeleteRhinoObject -= on_object
+    Rhino.RhinoDoc.UndeleteRhinoObject -= on_object
+    Rhino.RhinoDoc.ReplaceRhinoObject -= on_replace
+    Rhino.RhinoDoc.GroupTableEvent -= on_group
+    Rhino.RhinoDoc.CloseDocument -= on_close
+    Rhino.Commands.Command.UndoRedo -= on_undo_redo
 
 
 def __get_gid_by_identifier(identifier, doc=None):
@@ -29,8 +223,8 @@ def __get_gid_by_identifier(identifier, doc=None):
     return group.Index
 
 
-def get_component_by_identifier(identifier, doc=None):
-    return read_component(__get_gid_by_identifier(identifier), doc)
+def get_component_by_identifier(identifier, doc=None, cache=True):
+    return read_component(__get_gid_by_identifier(identifier, doc), doc, cache)
 
 
 def get_component_by_part_id(part_id, doc=None):
@@ -52,26 +246,221 @@ def create_component(component, doc=None):
     if doc is None:
         doc = sc.doc
 
-    group_index = component.serialize(doc)
-    group = doc.Groups.FindIndex(group_index)
-    group.SetUserString(TYPE_KEY, components.extract_classname(type(component)))
+    type_str = components.extract_classname(type(component))
+    with __own_changes():
+        with profiling.measure("serialize", type_str, doc):
+            group_index = component.serialize(doc)
+        group = doc.Groups.FindIndex(group_index)
+        group.SetUserString(TYPE_KEY, type_str)
+
+        parent_identifier = getattr(component, "parent_identifier", None)
+        if parent_identifier is not None:
+            group.SetUserString(PARENT_KEY, parent_identifier)
+
+    if parent_identifier is not None:
+        __get_parent_index(doc).setdefault(parent_identifier, set()).add(group_index)
+    __get_type_index(doc).setdefault(type_str, set()).add(group_index)
+    identifier = doc.Groups.GroupName(group_index)
+    __get_identifier_index(doc).add(identifier, group_index)
+    if type_str in CASSETTE_TYPES:
+        __add_cassette_part(
+            __get_cassette_index(doc), type_str, identifier, group_index
+        )
 
-    __GID_COMPONENT_MAPPER[group_index] = component
+    __get_cache(doc).put(group_index, component)
 
     return group_index
 
 
-def read_component(group_index, doc=None):
-    if group_index is None:
+def __get_type_index(doc):
+    index = __TYPE_INDICES.get(doc.RuntimeSerialNumber)
+    if index is None:
+        index = __build_type_index(doc)
+        __TYPE_INDICES[doc.RuntimeSerialNumber] = index
+
+    return index
+
+
+def __build_type_index(doc):
+    index = {}
+    for group in doc.Groups:
+        if group.IsDeleted:
+            continue
+
+        type_str = group.GetUserString(TYPE_KEY)
+        if type_str is None:
+            continue
+
+        index.setdefault(type_str, set()).add(group.Index)
+
+    return index
+
+
+def __get_identifier_index(doc):
+    index = __IDENTIFIER_INDICES.get(doc.RuntimeSerialNumber)
+    if index is None:
+        index = identifier_index.IdentifierIndex(
+            [
+                (group.Name, group.Index)
+                for group in doc.Groups
+                if not group.IsDeleted and group.Name
+            ]
+        )
+        __IDENTIFIER_INDICES[doc.RuntimeSerialNumber] = index
+
+    return index
+
+
+def __get_cassette_index(doc):
+    index = __CASSETTE_INDICES.get(doc.RuntimeSerialNumber)
+    if index is None:
+        index = {}
+        type_index = __get_type_index(doc)
+        for type_str in CASSETTE_TYPES:
+            for gid in type_index.get(type_str, []):
+                __add_cassette_part(index, type_str, doc.Groups.GroupName(gid), gid)
+        __CASSETTE_INDICES[doc.RuntimeSerialNumber] = index
+
+    return index
+
+
+def __add_cassette_part(index, type_str, identifier, group_index):
+    panel_identifier = keys.cassette_panel_identifier(identifier)
+    if panel_identifier is None:
         return
 
-    component = __GID_COMPONENT_MAPPER.get(group_index)
-    if component:
-        return component
+    index.setdefault(panel_identifier, {})[group_index] = (
+        CASSETTE_TYPES.index(type_str),
+        identifier,
+    )
+
+
+def __get_parent_index(doc):
+    index = __PARENT_INDICES.get(doc.RuntimeSerialNumber)
+    if index is None:
+        index = __build_parent_index(doc)
+        __PARENT_INDICES[doc.RuntimeSerialNumber] = index
+
+    return index
+
+
+def __build_parent_index(doc):
+    index = {}
+    for group in doc.Groups:
+        if group.IsDeleted:
+            continue
+
+        parent_identifier = group.GetUserString(PARENT_KEY)
+        if parent_identifier is None:
+            parent_identifier = __read_legacy_parent(group, doc)
+            if parent_identifier is None:
+                continue
+
+        index.setdefault(parent_identifier, set()).add(group.Index)
+
+    return index
+
+
+def __read_legacy_parent(group, doc):
+    """
+    Cylinders created before the parent index only store their parent on the volume object.
+    It is only kept in the index, building an index never changes the document.
+    """
+
+    component_type = components.COMPONENT_TYPES.get(group.GetUserString(TYPE_KEY))
+    if component_type is None or not issubclass(
+        component_type, cylinder_base.CylinderBase
+    ):
+        return
+
+    members = doc.Groups.GroupMembers(group.Index)
+    if not members:
+        return
+
+    parent_identifier = members[0].Attributes.UserDictionary.GetString(
+        cylinder_base.PARENT_KEY
+    )
+    if parent_identifier is None:
+        parent_identifier = ""
+
+    return parent_identifier
+
+
+def get_component_ids_by_parent(parent_identifier, component_type=None, doc=None):
+    """
+    Gets the group indices of all components with the given parent identifier,
+    without deserializing them.
+
+    Args:
+        parent_identifier (str): The identifier of the parent component
+        component_type (type, optional): Only get components of this type
+        doc (RhinoDoc, optional): The document to search in
+
+    Returns:
+        list[int]: The sorted group indices
+    """
+
+    if doc is None:
+        doc = sc.doc
+
+    gids = __get_parent_index(doc).get(parent_identifier, set())
+
+    if component_type is not None:
+        type_str = components.extract_classname(component_type)
+        gids = [
+            gid
+            for gid in gids
+            if doc.Groups.FindIndex(gid).GetUserString(TYPE_KEY) == type_str
+        ]
+
+    return sorted(gids)
+
+
+def get_components_by_parent(parent_identifier, component_type=None, doc=None):
+    """
+    Gets all components with the given parent identifier,
+    e.g. all dowels, screws and inserts of a panel.
+    Only the matching components are deserialized.
+
+    Args:
+        parent_identifier (str): The identifier of the parent component
+        component_type (type, optional): Only get components of this type
+        doc (RhinoDoc, optional): The document to search in
+
+    Returns:
+        list: The matching components
+    """
+
+    return [
+        read_component(gid, doc)
+        for gid in get_component_ids_by_parent(parent_identifier, component_type, doc)
+    ]
+
+
+def read_component(group_index, doc=None, cache=True):
+    """
+    Reads the component at the given group index
+
+    Args:
+        group_index (int): The group index of the component
+        doc (RhinoDoc, optional): The document to read from
+        cache (bool, optional): Keep the component in the repository cache.
+        Pass False when streaming over a lot of components, to keep memory bounded.
+
+    Returns:
+        Component: The deserialized component
+    """
+
+    if group_index is None:
+        return
 
     if doc is None:
         doc = sc.doc
 
+    component = __get_cache(doc).get(group_index)
+    if component:
+        return component
+
     group = doc.Groups.FindIndex(group_index)
     if group is None:
         logging.error("No group defined at index {}".format(group_index))
@@ -83,68 +472,90 @@ def read_component(group_index, doc=None):
         logging.error("Unknown component type")
         return
 
-    __GID_COMPONENT_MAPPER[group_index] = component_type.deserialize(group_index)
+    with profiling.measure("deserialize", type_str, doc):
+        component = component_type.deserialize(group_index, doc)
 
-    return __GID_COMPONENT_MAPPER[group_index]
+    if cache:
+        __get_cache(doc).put(group_index, component)
 
+    return component
 
-def commit_changes():
-    for component in __GID_COMPONENT_MAPPER.values():
-        component.serialize()
 
+def mark_dirty(component, doc=None):
+    """
+    Marks a changed component, so it is kept in the cache
+    until the next `commit_changes()` serializes it
+    """
 
-def update_component(component, doc=None):
-    gid = __get_gid_by_identifier(component.identifier)
-    if not gid:
-        logging.error(
-            "Tried to update non existing component {}".format(component.identifier)
-        )
+    if doc is None:
+        doc = sc.doc
+
+    gid = __get_gid_by_identifier(component.identifier, doc)
+    if gid is None:
         return
 
-    component.serialize()
+    __get_cache(doc).put(gid, component, dirty=True)
 
-    __GID_COMPONENT_MAPPER[gid] = component
 
+def commit_changes(doc=None):
+    """
+    Serializes all components marked as dirty, see `mark_dirty()`
+    """
 
-def __get_layer_group_ids(layer_name, doc=None):
-    if not doc:
+    if doc is None:
         doc = sc.doc
 
-    layer = doc.Layers.FindName(layer_name)
-    if layer is None:
-        logging.error("Failed to find layer {}".format(layer_name))
-        return
+    component_cache = __get_cache(doc)
+    for gid, component in component_cache.dirty_items():
+        with __own_changes(), profiling.measure(
+            "serialize", components.extract_classname(type(component)), doc
+        ):
+            component.serialize(doc)
+        component_cache.mark_clean(gid)
+
+
+def clear_cache():
+    """
+    Forgets all read and created components, e.g. before switching documents
+    """
+    __COMPONENT_CACHES.clear()
+    __drop_indices()
 
-    objects = doc.Objects.FindByLayer(layer)
 
-    gids = set()
+def update_component(component, doc=None):
+    if doc is None:
+        doc = sc.doc
 
-    for object in objects:
-        if object.GroupCount != 1:
-            continue
-        gids.add(object.GetGroupList()[0])
+    gid = __get_gid_by_identifier(component.identifier, doc)
+    if gid is None:
+        logging.error(
+            "Tried to update non existing component {}".format(component.identifier)
+        )
+        return
 
-    return gids
+    with __own_changes(), profiling.measure(
+        "serialize", components.extract_classname(type(component)), doc
+    ):
+        component.serialize(doc)
+
+    component_cache = __get_cache(doc)
+    component_cache.put(gid, component)
+    component_cache.mark_clean(gid)
 
 
 def search_components(search, doc=None):
     """
     Searches for components by identifier search.
-    Supports wildcards.
+    Supports wildcards, see `fnmatch`.
+
+    Returns:
+        list[int]: The group indices of all matches, in identifier order
     """
 
     if doc is None:
         doc = sc.doc
 
-    found = []
-    for group in sc.doc.Groups:
-        matches = fnmatch.filter([group.Name], search)
-        if not matches:
-            continue
-
-        found.append(group.Index)
-
-    return found
+    return __get_identifier_index(doc).search(search)
 
 
 def select_component(gid, doc=None):
@@ -159,74 +570,283 @@ def select_component(gid, doc=None):
         rhobj.Select(True)
 
 
+def __get_type_group_ids(component_type, doc=None):
+    if doc is None:
+        doc = sc.doc
+
+    return __get_type_index(doc).get(
+        components.extract_classname(component_type), set()
+    )
+
+
+def get_all_component_ids(component_type, doc=None):
+    """
+    Gets the group indices of all components of the given type,
+    without deserializing them.
+
+    Returns:
+        list[int]: The sorted group indices
+    """
+
+    return sorted(__get_type_group_ids(component_type, doc))
+
+
+def iter_components(component_type, doc=None, cache=True):
+    """
+    Reads all components of the given type one at a time, in group index order.
+    Pass cache=False to keep memory bounded while streaming over a lot of components.
+
+    Yields:
+        Component: The deserialized components
+    """
+
+    for gid in get_all_component_ids(component_type, doc):
+        component = read_component(gid, doc, cache)
+        if component is not None:
+            yield component
+
+
 def get_all_components(component_type, doc=None):
+    return list(iter_components(component_type, doc))
+
+
+def delete_component(group_index, doc=None):
+    """
+    Deletes the group at the given index, together with all it's members
+    """
+
     if doc is None:
         doc = sc.doc
 
-    main_layer = doc.Layers.FindName(component_type._LAYER_NAME)
-    if not main_layer:
-        logging.error(
-            "Failed to find component layer for type {}!".format(component_type)
+    identifier = doc.Groups.GroupName(group_index)
+    with __own_changes():
+        for member in doc.Groups.GroupMembers(group_index) or []:
+            doc.Objects.Delete(member, True)
+        doc.Groups.Delete(group_index)
+
+    __get_cache(doc).pop(group_index)
+    for children in __get_parent_index(doc).values():
+        children.discard(group_index)
+    for gids in __get_type_index(doc).values():
+        gids.discard(group_index)
+    if identifier:
+        __get_identifier_index(doc).remove(identifier, group_index)
+        parts = __get_cassette_index(doc).get(
+            keys.cassette_panel_identifier(identifier), {}
         )
-        return
+        parts.pop(group_index, None)
 
-    children = main_layer.GetChildren()
-    if children.Count == 0:
-        logging.error("Failed to find child layers for type {}!".format(component_type))
-        return
 
-    # for gids in children, union to set
-    gids = set()
+def remove_duplicate_cylinders(component_type, doc=None):
+    """
+    Collapses all cylinders of the given type, that share the same
+    parent and match in plane, radius and height within tolerance, into the first one found.
+    Groups of kept cylinders are named after their identifier, so they are re-used
+    on the next serialization.
+
+    Args:
+        component_type (type): A type deriving from CylinderBase, e.g. Dowel
+        doc (RhinoDoc, optional): The document to clean up
+
+    Returns:
+        int: The number of removed duplicates
+    """
+
+    if doc is None:
+        doc = sc.doc
+
+    gids = __get_type_group_ids(component_type, doc)
+
+    kept = {}
+    """Kept cylinders by parent identifier"""
+    removed = 0
+    for gid in sorted(gids):
+        cylinder = component_type.deserialize(gid, doc)
+        siblings = kept.setdefault(cylinder.parent_identifier, [])
+
+        if any(
+            sibling.matches(cylinder.plane, cylinder.radius, cylinder.height)
+            for sibling in siblings
+        ):
+            delete_component(gid, doc)
+            removed += 1
+            continue
+
+        siblings.append(cylinder)
+        old_name = doc.Groups.GroupName(gid)
+        if old_name != cylinder.identifier:
+            with __own_changes():
+                doc.Groups.ChangeGroupName(gid, cylinder.identifier)
+
+            index = __get_identifier_index(doc)
+            if old_name:
+                index.remove(old_name, gid)
+            index.add(cylinder.identifier, gid)
+
+    return removed
+
+
+def get_cassette_part_ids(panel_identifier, doc=None):
+    """
+    Gets the group indices of the plate, skeleton and beams of a panel,
+    from the cassette index, without deserializing them.
+
+    Returns:
+        list[int]: The group indices, plate first, then skeleton, then beams by identifier
+    """
 
-    # get comps for gids set
-    for layer in children:
-        gids = gids.union(__get_layer_group_ids(layer.Name, doc))
+    if doc is None:
+        doc = sc.doc
 
-    # return coms
-    return [read_component(gid, doc) for gid in gids]
+    parts = __get_cassette_index(doc).get(panel_identifier, {})
+    return sorted(parts, key=lambda gid: parts[gid])
 
 
-def get_cassette_from_panel(panel):
+def get_cassette_from_panel(panel, doc=None, cache=True):
     """
     Gets all components that 'belongs' to a logic cassette.
     This won't get non-components like screws and dowels, you
-    will need to find them by calling `get_all_components()`.
+    will need to find them by calling `get_components_by_parent()`.
+    Pass cache=False to read the components without keeping them in the cache.
+    Beams and plates only load their geometry on first access.
     """
 
-    components = []
+    gids = get_cassette_part_ids(panel.identifier, doc)
 
-    # get panel plate
-    plate_ident = keys.panel_plate_identifier(panel.identifier)
-    plate = get_component_by_identifier(plate_ident)
-    if not plate:
-        logging.warn("Could not find a plate for panel {}".format(panel.identifier))
-    else:
-        components.append(plate)
-
-    # get panel skeleton
-    skeleton_ident = keys.panel_skeleton_identifier(panel.identifier)
-    skeleton = get_component_by_identifier(skeleton_ident)
-    if not skeleton:
-        logging.warn("Could not find skeleton for panel {}".format(panel.identifier))
-    else:
-        components.append(skeleton)
-
-    # get panel beams
-    edge_keys = keys.edge_keys(panel.outline.corner_count)
-    for level in range(3):
-        for key in edge_keys:
-            beam_ident = keys.panel_beam_identifier(panel.identifier, level, key)
-            beam = get_component_by_identifier(beam_ident)
-            if not beam:
-                logging.warn(
-                    "Could not find beam {}{}{}".format(panel.identifier, level, key)
-                )
-            else:
-                components.append(beam)
+    expected = 2 + 3 * panel.outline.corner_count
+    if len(gids) < expected:
+        logging.warn(
+            "Cassette of panel {} is missing {} of {} components".format(
+                panel.identifier, expected - len(gids), expected
+            )
+        )
+
+    components = []
+    for gid in gids:
+        component = read_component(gid, doc, cache)
+        if component is not None:
+            components.append(component)
 
     return components
 
 
+def get_cassettes(panels, doc=None, cache=True):
+    """
+    Gets the cassette components of many panels, see `get_cassette_from_panel()`
+
+    Returns:
+        list[(Panel, list[Component])]: The panels, together with their cassette components
+    """
+
+    return [(panel, get_cassette_from_panel(panel, doc, cache)) for panel in panels]
+
+
+def get_cassette_ids_from_panel(panel, doc=None):
+    """
+    Gets the group indices of a whole cassette, without deserializing it.
+    This is the panel, it's plate, skeleton and beams,
+    and all children of the panel, like dowels, screws and inserts.
+
+    Returns:
+        list[int]: The sorted group indices
+    """
+
+    if doc is None:
+        doc = sc.doc
+
+    gids = set(get_component_ids_by_parent(panel.identifier, doc=doc))
+    gids.update(get_cassette_part_ids(panel.identifier, doc))
+
+    panel_group = doc.Groups.FindName(panel.identifier)
+    if panel_group is not None:
+        gids.add(panel_group.Index)
+
+    return sorted(gids)
+
+
+def transform_components(group_indices, xform, doc=None):
+    """
+    Transforms all objects of the given component groups directly in the document,
+    without deserializing or serializing any component.
+    Cached instances of the transformed components are dropped,
+    so the next read returns the transformed state.
+
+    Args:
+        group_indices (list[int]): The group indices of the components
+        xform (Transform): The transformation to apply
+        doc (RhinoDoc, optional): The document to transform in
+
+    Returns:
+        int: The number of transformed objects
+    """
+
+    if doc is None:
+        doc = sc.doc
+
+    # cylinder identifiers describe their placement, so they are transformed by type
+    cylinder_gids = {}
+    other_gids = []
+    for gid in group_indices:
+        component_type = components.COMPONENT_TYPES.get(
+            doc.Groups.FindIndex(gid).GetUserString(TYPE_KEY)
+        )
+        if component_type is not None and issubclass(
+            component_type, cylinder_base.CylinderBase
+        ):
+            cylinder_gids.setdefault(component_type, []).append(gid)
+        else:
+            other_gids.append(gid)
+
+    transformed = 0
+    renamed = []
+    with __own_changes():
+        for component_type, gids in cylinder_gids.items():
+            transformed_cylinders = component_type.transform_groups(gids, xform, doc)
+            renamed.extend(transformed_cylinders)
+            transformed += len(transformed_cylinders)
+
+        for gid in other_gids:
+            for member in doc.Groups.GroupMembers(gid) or []:
+                # replacing the original keeps the object id and group membership
+                if doc.Objects.Transform(member.Id, xform, True) == Guid.Empty:
+                    logging.error(
+                        "Failed to transform object {} of group {}".format(
+                            member.Id, gid
+                        )
+                    )
+                    continue
+
+                transformed += 1
+
+    # update the identifier index for all renamed cylinders at once
+    index = __get_identifier_index(doc)
+    for gid, old_identifier, identifier in renamed:
+        if old_identifier != identifier:
+            index.remove(old_identifier, gid)
+            index.add(identifier, gid)
+
+    component_cache = __get_cache(doc)
+    for gid in group_indices:
+        component_cache.pop(gid)
+
+    return transformed
+
+
+def transform_cassette(panel, xform, doc=None):
+    """
+    Transforms a whole cassette in the document, see `get_cassette_ids_from_panel`.
+    The given panel instance is not transformed, read it again if needed.
+
+    Returns:
+        int: The number of transformed objects
+    """
+
+    return transform_components(get_cassette_ids_from_panel(panel, doc), xform, doc)
+
+
+subscribe_events()
+
+
 if __name__ == "__main__":
     a = read_component(0)
     b = read_component(0)
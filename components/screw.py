@@ -43,10 +43,11 @@ class Screw(CylinderBase):
         # create the screw body
         screw_cylinder = rg.Cylinder(rg.Circle(plane, radius), height)
 
-        # create the screw head
-        plane.Flip()
+        # create the screw head on a flipped copy, so the given plane stays untouched
+        head_plane = rg.Plane(plane)
+        head_plane.Flip()
         screw_hex_base = rg.Polyline.CreateInscribedPolygon(
-            rg.Circle(plane, radius * 1.9), 6
+            rg.Circle(head_plane, radius * 1.9), 6
         )
         screw_head = rg.Extrusion.Create(
             screw_hex_base.ToPolylineCurve(), HEAD_THICKNESS, True
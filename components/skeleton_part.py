@@ -2,7 +2,7 @@ import math
 from components.component import Component
 import logging
 from components.joint import JointFactory
-from helpers import algorithms, serde, keys
+from helpers import algorithms, profiling, serde, keys
 from helpers.geometry import ClosedPolyline
 import Rhino.Geometry as rg
 import Rhino
@@ -17,13 +17,20 @@ SIZE = 200
 
 class SkeletonFactory(object):
     @staticmethod
-    def create_skeletonpart(skeleton, panel):
+    def calculate_cutting_planes(panel, neighbors):
+        """
+        Calculates the planes at which the exoskeleton is split for the given panel
 
-        # calculate cutting planes
-        planes = []
-        for neighbor_id in panel.get_existing_neighbor_ids():
-            neighbor = repo.get_component_by_part_id(neighbor_id)
+        Args:
+            panel (Panel): The panel to calculate the cutting planes for
+            neighbors (list[Panel]): The neighboring panels
 
+        Returns:
+            list[Plane]: The cutting planes
+        """
+
+        planes = []
+        for neighbor in neighbors:
             key = JointFactory.get_shared_edge_key(panel, neighbor)
 
             plane = JointFactory.calculate_shared_plane(panel, neighbor, key)
@@ -32,6 +39,24 @@ class SkeletonFactory(object):
 
             planes.append(plane)
 
+        return planes
+
+    @staticmethod
+    @profiling.measure("split", "skeleton")
+    def split_skeleton(skeleton, panel, planes):
+        """
+        Splits the skeleton part for the given panel out of the exoskeleton.
+        This does not touch the rhino document, so it is safe to call from worker threads.
+
+        Args:
+            skeleton (Brep): The exoskeleton geometry, it will not be changed
+            panel (Panel): The panel to create the skeleton part for
+            planes (list[Plane]): The cutting planes, see `calculate_cutting_planes`
+
+        Returns:
+            (SkeletonPart, str): The skeleton part, or None and an error message if splitting failed
+        """
+
         # convert planes to breps
         cutters = List[rg.Brep]()
         for plane in planes:
@@ -42,14 +67,12 @@ class SkeletonFactory(object):
         # split skeleton with cutters
         parts = skeleton.Split(cutters, 0.001)
         if parts.Count != 2:
-            logging.error(
+            return (
+                None,
                 "Failed to split skeleton in parts! Expected 2 parts, but got {}!".format(
                     parts.Count
-                )
+                ),
             )
-            for cutter in cutters:
-                sc.doc.Objects.AddBrep(cutter)
-            return
 
         # find the smaller part by comparing their bboxes
         part = sorted(parts, key=lambda x: x.GetBoundingBox(False).Area)[0]
@@ -57,10 +80,30 @@ class SkeletonFactory(object):
         # make sure part is a solid
         part = part.CapPlanarHoles(0.001)
 
-        return SkeletonPart(
-            keys.panel_skeleton_identifier(panel.identifier), panel.plane, part
+        return (
+            SkeletonPart(
+                keys.panel_skeleton_identifier(panel.identifier), panel.plane, part
+            ),
+            None,
         )
 
+    @staticmethod
+    def create_skeletonpart(skeleton, panel):
+
+        # calculate cutting planes
+        neighbors = [
+            repo.get_component_by_part_id(neighbor_id)
+            for neighbor_id in panel.get_existing_neighbor_ids()
+        ]
+        planes = SkeletonFactory.calculate_cutting_planes(panel, neighbors)
+
+        part, error = SkeletonFactory.split_skeleton(skeleton, panel, planes)
+        if error is not None:
+            logging.error(error)
+            return
+
+        return part
+
 
 class SkeletonPart(Component):
 
@@ -89,16 +132,15 @@ class SkeletonPart(Component):
         # create a new, empty instance of self
         self = cls.__new__(cls)
 
+        # get group members for given index
+        members = serde.GroupMembers(group_index, doc)
+
         # find out what identifier we are working with
-        identifier = doc.Groups.GroupName(group_index)
-        if identifier is None:
+        if members.identifier is None:
             return
 
-        # get group members for given index
-        members = doc.Groups.GroupMembers(group_index)
-
         # get the label object
-        label_obj = [member for member in members if member.Name == identifier][0]
+        label_obj = members.label
         self.label = label_obj.Geometry
         self.label_id = label_obj.Id
 
@@ -108,11 +150,7 @@ class SkeletonPart(Component):
             self.__setattr__(key, value)
 
         # get the skeleton geo
-        skeleton_obj = [
-            member
-            for member in members
-            if member.ObjectType == Rhino.DocObjects.ObjectType.Brep
-        ][0]
+        skeleton_obj = members.of_type(Rhino.DocObjects.ObjectType.Brep)[0]
         self.skeleton_geo = skeleton_obj.Geometry
         self.skeleton_id = skeleton_obj.Id
 
@@ -147,6 +185,7 @@ class SkeletonPart(Component):
             doc,
             old_id=self.skeleton_id,
         )
+        self.skeleton_id = id
         assembly_ids.append(id)
 
         # add serialized geo as a group
@@ -4,6 +4,7 @@ import scriptcontext as sc
 import math
 import logging
 import string
+from helpers import profiling
 
 """
 Module that exposes general-purpose geometric algorithms,
@@ -254,6 +255,7 @@ def are_lines_equal(a, b):
     return False
 
 
+@profiling.measure("loft")
 def loft_curves(top_crv, bottom_crv):
     # loft between top and bottom
     results = rg.Brep.CreateFromLoft(
@@ -7,6 +7,7 @@ from algorithms import (
 from components.beam import Beam
 from geometry import ClosedPolyline
 from helpers import algorithms
+from helpers.settings import GeometrySettings
 import keys
 
 # TODO: Would have been smarter to abstract cassette levels into own class
@@ -26,7 +27,7 @@ class CassetteBeamLayer(object):
         self.parent_identifier = parent_ident
         self.level = level
         self.neighbor_angles = neighbor_angles
-        self.geometry_settings = geometry_settings
+        self.geometry_settings = GeometrySettings.from_mapping(geometry_settings)
 
         # calculate and set plane
         self.plane = rg.Plane(top_outline.center_point(), normal)
@@ -38,7 +39,7 @@ class CassetteBeamLayer(object):
                 top_outline,
                 self.plane,
                 self.neighbor_angles,
-                self.geometry_settings["beam_thickness"],
+                self.geometry_settings.beam_thickness,
             ),
         }
 
@@ -85,6 +86,8 @@ class CassetteBeamLayer(object):
 
         # TODO: Re-write to work with angle dict
 
+        geometry_settings = GeometrySettings.from_mapping(geometry_settings)
+
         # initialize corner names and corners
         corners = {}
         point_count = outline.corner_count
@@ -115,9 +118,9 @@ class CassetteBeamLayer(object):
 
             # calculate c, gamma and a
             offset_amount = (
-                geometry_settings["beam_max_width"]
+                geometry_settings.beam_max_width
                 + math.tan(math.pi - angles[keys.edge_key_from_index(i)] / 2.0)
-                * geometry_settings["beam_thickness"]
+                * geometry_settings.beam_thickness
                 * level
             )
 
@@ -191,7 +194,7 @@ class CassetteBeamLayer(object):
             beam = Beam(
                 ident,
                 plane,
-                self.geometry_settings["beam_thickness"],
+                self.geometry_settings.beam_thickness,
                 outline,
                 beam_angles,
             )
@@ -0,0 +1,353 @@
+import hashlib
+import logging
+import Rhino.Geometry as rg
+from collections import OrderedDict
+from System.Collections.Generic import List
+from helpers import parallel, profiling
+
+"""
+Module that exposes boolean operations tuned for detailing,
+where a lot of small cutters get subtracted from a few volumes
+"""
+
+DEFAULT_MAX_ENTRIES = 256
+"""The default number of boolean results kept per cache"""
+
+
+def geometry_hash(brep):
+    """
+    Calculates an exact fingerprint of the given brep, from all vertex locations,
+    the edge topology and a point on every edge and face.
+    Nothing is rounded, so only identical breps share a fingerprint.
+
+    Args:
+        brep (Brep): The brep to fingerprint
+
+    Returns:
+        str: The fingerprint, usable as a dictionary key
+    """
+
+    def point(pt):
+        return (pt.X, pt.Y, pt.Z)
+
+    values = [(brep.Faces.Count, brep.Edges.Count, brep.Vertices.Count)]
+    for vertex in brep.Vertices:
+        values.append(point(vertex.Location))
+    for edge in brep.Edges:
+        values.append(
+            (
+                edge.StartVertex.VertexIndex,
+                edge.EndVertex.VertexIndex,
+                point(edge.PointAt(edge.Domain.Mid)),
+            )
+        )
+    for face in brep.Faces:
+        values.append(point(face.PointAt(face.Domain(0).Mid, face.Domain(1).Mid)))
+
+    # repr keeps every bit of a float
+    return hashlib.md5(repr(values).encode("utf-8")).hexdigest()
+
+
+def input_hash(volume, cutters, hashes=None):
+    """
+    Calculates the fingerprint of the inputs of a boolean difference
+
+    Args:
+        volume (Brep): The volume to subtract from
+        cutters (list[Brep]): The cutters to subtract
+        hashes (dict, optional): Already calculated geometry hashes by brep id(),
+        so cutters shared by many volumes are only hashed once
+
+    Returns:
+        tuple: The fingerprint, see `geometry_hash`
+    """
+
+    if hashes is None:
+        hashes = {}
+
+    def brep_hash(brep):
+        value = hashes.get(id(brep))
+        if value is None:
+            value = geometry_hash(brep)
+            hashes[id(brep)] = value
+        return value
+
+    return (brep_hash(volume), tuple(sorted(brep_hash(cutter) for cutter in cutters)))
+
+
+class DifferenceCache(object):
+    """
+    A least recently used cache of boolean difference results,
+    keyed by the exact hashes of their inputs and the tolerance.
+    The hashes are exact, so results are safely re-used across runs and documents,
+    e.g. when the booleans stage re-runs for unchanged parts.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries (int, optional): The number of results to keep
+        """
+
+        self.max_entries = max_entries
+        self.__entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, key):
+        """
+        Gets a duplicate of the cached result
+
+        Returns:
+            Brep: The result, or None if it is not cached
+        """
+
+        result = self.__entries.pop(key, None)
+        if result is None:
+            return
+
+        self.__entries[key] = result
+        return result.DuplicateBrep()
+
+    def put(self, key, result):
+        self.__entries.pop(key, None)
+        self.__entries[key] = result.DuplicateBrep()
+
+        while len(self.__entries) > self.max_entries:
+            self.__entries.popitem(last=False)
+
+    def clear(self):
+        self.__entries.clear()
+
+
+DIFFERENCE_CACHE = DifferenceCache()
+"""The boolean results shared by all detailing runs"""
+
+
+def clear_cache():
+    """
+    Clears all cached boolean results
+    """
+    DIFFERENCE_CACHE.clear()
+
+
+class CutterSet(object):
+    """
+    A set of cutter volumes, spatially indexed by their bounding boxes,
+    so only the cutters overlapping a volume need to take part in a boolean
+    """
+
+    def __init__(self, cutters):
+        self.cutters = [cutter for cutter in cutters if cutter is not None]
+        self.hashes = {}
+        """Geometry hashes of the cutters, filled by cached booleans, see `input_hash`"""
+        self.__tree = rg.RTree()
+
+        for index, cutter in enumerate(self.cutters):
+            self.__tree.Insert(cutter.GetBoundingBox(False), index)
+
+    def __len__(self):
+        return len(self.cutters)
+
+    def overlapping(self, volume, tolerance=0.001):
+        """
+        Gets all cutters whose bounding box overlaps the bounding box of the given volume
+
+        Args:
+            volume (Brep): The volume to test against
+            tolerance (float, optional): The amount by which the volume bounding box is inflated
+
+        Returns:
+            list[Brep]: The overlapping cutters, in insertion order
+        """
+
+        bbox = volume.GetBoundingBox(False)
+        bbox.Inflate(tolerance)
+
+        indices = []
+
+        def on_found(sender, args):
+            indices.append(args.Id)
+
+        self.__tree.Search(bbox, on_found)
+
+        return [self.cutters[index] for index in sorted(indices)]
+
+
+@profiling.measure("boolean", "difference")
+def boolean_difference(volume, cutters, tolerance=0.001, cache=None, hashes=None):
+    """
+    Subtracts the given cutters from the volume.
+    If a cache is given, results are cached by the hashes of their inputs,
+    so repeating a boolean on unchanged geometry is free.
+
+    Args:
+        volume (Brep): The volume to subtract from
+        cutters (list[Brep]): The cutters to subtract
+        tolerance (float, optional): The boolean tolerance
+        cache (DifferenceCache, optional): The cache of earlier results
+        hashes (dict, optional): Already calculated geometry hashes, see `input_hash`
+
+    Returns:
+        Brep: The first resulting brep, or None if the boolean failed
+    """
+
+    key = None
+    if cache is not None:
+        key = (input_hash(volume, cutters, hashes), tolerance)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    volumes = List[rg.Brep]()
+    volumes.Add(volume)
+    cutter_list = List[rg.Brep]()
+    for cutter in cutters:
+        cutter_list.Add(cutter)
+
+    result = rg.Brep.CreateBooleanDifference(volumes, cutter_list, tolerance)
+    if not result:
+        return
+
+    if cache is not None:
+        cache.put(key, result[0])
+    return result[0]
+
+
+def detail_volume(volume, cutter_set, tolerance=0.001, cache=None):
+    """
+    Subtracts all cutters of the cutter set, that overlap the volume.
+
+    Args:
+        volume (Brep): The volume to detail
+        cutter_set (CutterSet): The spatially indexed cutters
+        tolerance (float, optional): The boolean tolerance
+        cache (DifferenceCache, optional): The cache of earlier results
+
+    Returns:
+        Brep: The detailed volume, or None if no cutter overlaps or the boolean failed
+    """
+
+    cutters = cutter_set.overlapping(volume, tolerance)
+    if not cutters:
+        return
+
+    return boolean_difference(volume, cutters, tolerance, cache, cutter_set.hashes)
+
+
+class BooleanJob(object):
+    """
+    A boolean difference of a set of cutters from the volume of a component
+    """
+
+    def __init__(self, component, volume, cutters):
+        self.component = component
+        self.volume = volume
+        self.cutters = cutters
+        self.input_hash = None
+        """The fingerprint of volume and cutters, calculated once when first needed"""
+
+    @property
+    def estimated_cost(self):
+        """
+        The face count of all involved breps, a rough estimate of the boolean runtime
+        """
+        return self.volume.Faces.Count + sum(
+            cutter.Faces.Count for cutter in self.cutters
+        )
+
+
+def run_difference_jobs(
+    jobs,
+    tolerance=0.001,
+    relaxed_tolerance=0.01,
+    timeout=60.0,
+    max_workers=None,
+    cache=None,
+):
+    """
+    Runs the given boolean jobs on a thread pool, most expensive jobs first.
+    Jobs that fail are retried once with the relaxed tolerance.
+    Jobs that time out are not, as they keep running in the background.
+    The jobs never touch the rhino document, commit the results afterwards.
+    Jobs work on duplicates of their breps, as neighboring jobs share cutters.
+    The cache is only used on this thread.
+
+    Args:
+        jobs (list[BooleanJob]): The jobs to run
+        tolerance (float, optional): The boolean tolerance
+        relaxed_tolerance (float, optional): The tolerance used to retry failed jobs
+        timeout (float, optional): The time in seconds after which a job counts as failed
+        max_workers (int, optional): The maximum number of concurrent jobs
+        cache (DifferenceCache, optional): The cache of earlier results
+
+    Returns:
+        (list[(BooleanJob, Brep)], list[(BooleanJob, str)]): The successful jobs with their result,
+        and the failed jobs with an error message
+    """
+
+    jobs = sorted(jobs, key=lambda job: job.estimated_cost, reverse=True)
+
+    # neighboring jobs share cutters, hash them only once
+    hashes = {}
+
+    def run_with(jobs, tolerance):
+        results = [None] * len(jobs)
+        cache_keys = [None] * len(jobs)
+
+        pending = []
+        for index, job in enumerate(jobs):
+            if cache is not None:
+                if job.input_hash is None:
+                    job.input_hash = input_hash(job.volume, job.cutters, hashes)
+                cache_keys[index] = (job.input_hash, tolerance)
+                cached = cache.get(cache_keys[index])
+                if cached is not None:
+                    results[index] = parallel.JobResult(job, cached)
+                    continue
+
+            pending.append(
+                (
+                    index,
+                    job.volume.DuplicateBrep(),
+                    [cutter.DuplicateBrep() for cutter in job.cutters],
+                )
+            )
+
+        for job_result in parallel.run(
+            lambda item: boolean_difference(item[1], item[2], tolerance),
+            pending,
+            max_workers=max_workers,
+            timeout=timeout,
+        ):
+            index = job_result.item[0]
+            if cache is not None and job_result.result is not None:
+                cache.put(cache_keys[index], job_result.result)
+            results[index] = parallel.JobResult(
+                jobs[index], job_result.result, job_result.error, job_result.timed_out
+            )
+
+        return results
+
+    succeeded = []
+    failed = []
+    failures = []
+    for job_result in run_with(jobs, tolerance):
+        if job_result.succeeded and job_result.result is not None:
+            succeeded.append((job_result.item, job_result.result))
+        elif job_result.timed_out:
+            # the job is still running, don't pile a retry on top of it
+            failures.append((job_result.item, job_result.error))
+        else:
+            failed.append(job_result.item)
+
+    for job_result in run_with(failed, relaxed_tolerance):
+        if not job_result.succeeded:
+            failures.append((job_result.item, job_result.error))
+        elif job_result.result is None:
+            failures.append((job_result.item, "Boolean difference failed"))
+        else:
+            succeeded.append((job_result.item, job_result.result))
+
+    return succeeded, failures
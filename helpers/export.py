@@ -0,0 +1,233 @@
+import math
+import os
+import Rhino
+import Rhino.Geometry as rg
+
+"""
+Module that exposes writers for single fabrication parts.
+Every writer takes the geometries of exactly one part and writes them to one file,
+so nothing is kept in memory between two parts.
+Volumes are written through rhino, 2d outlines are written as plain text.
+"""
+
+FORMATS = ["3dm", "step", "dxf"]
+"""All supported export formats, which are also the file extensions"""
+
+
+def _file_path(path, extension):
+    """
+    Adds the extension to the path, and creates the directory if needed
+    """
+
+    path = "{}.{}".format(path, extension)
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    return path
+
+
+def write_3dm(path, geometries):
+    """
+    Writes the given geometries to a new 3dm file, without touching any document
+    """
+
+    model = Rhino.FileIO.File3dm()
+    try:
+        for geometry in geometries:
+            model.Objects.Add(geometry, Rhino.DocObjects.ObjectAttributes())
+        return model.Write(path, 0)
+    finally:
+        model.Dispose()
+
+
+def write_exported(path, geometries):
+    """
+    Writes the given geometries in the format given by the file extension,
+    using a scratch headless document and the rhino exporters
+    """
+
+    doc = Rhino.RhinoDoc.CreateHeadless(None)
+    try:
+        for geometry in geometries:
+            doc.Objects.Add(geometry)
+        return doc.Export(path)
+    finally:
+        doc.Dispose()
+
+
+def outline_curves(brep):
+    """
+    Gets the edge curves of the given brep, which for a flattened part
+    are the outlines the CNC needs
+
+    Returns:
+        list[Curve]: The joined edge curves
+    """
+
+    edges = brep.DuplicateEdgeCurves(False)
+    if not edges:
+        return []
+
+    return list(rg.Curve.JoinCurves(edges, 0.001))
+
+
+def write_part(path, geometries, file_format):
+    """
+    Writes a single fabrication part
+
+    Args:
+        path (str): The file path without extension
+        geometries (list[GeometryBase]): The flattened part geometry
+        file_format (str): One of `FORMATS`. dxf files hold the outline curves only.
+
+    Returns:
+        (bool, str): If the write succeeded, and the path of the written file
+    """
+
+    if file_format not in FORMATS:
+        raise ValueError("Unknown export format {}".format(file_format))
+
+    path = _file_path(path, file_format)
+
+    if file_format == "3dm":
+        return write_3dm(path, geometries), path
+
+    if file_format == "dxf":
+        curves = []
+        for geometry in geometries:
+            if isinstance(geometry, rg.Brep):
+                curves.extend(outline_curves(geometry))
+            elif isinstance(geometry, rg.Curve):
+                curves.append(geometry)
+        geometries = curves
+
+    return write_exported(path, geometries), path
+
+
+OUTLINE_FORMATS = ["dxf", "svg"]
+"""All supported 2d outline formats, which are also the file extensions"""
+
+
+def to_polyline(curve, tolerance=0.01):
+    """
+    Discretizes the given curve into a polyline, ready for toolpath generation
+
+    Args:
+        curve (Curve): The curve to discretize
+        tolerance (float, optional): The maximum deviation from the curve
+
+    Returns:
+        Polyline: The polyline, or None if the curve could not be discretized
+    """
+
+    success, pline = curve.TryGetPolyline()
+    if success:
+        return pline
+
+    pline_crv = curve.ToPolyline(tolerance, math.radians(5.0), 0.0, 0.0)
+    if pline_crv is None:
+        return
+
+    success, pline = pline_crv.TryGetPolyline()
+    if not success:
+        return
+
+    return pline
+
+
+def _dxf_polyline(layer, pline):
+    lines = ["0", "POLYLINE", "8", layer, "66", "1", "70", "1"]
+    points = list(pline)
+    if pline.IsClosed:
+        points = points[:-1]
+    for point in points:
+        lines.extend(
+            ["0", "VERTEX", "8", layer, "10", repr(point.X), "20", repr(point.Y)]
+        )
+    lines.extend(["0", "SEQEND", "8", layer])
+    return lines
+
+
+def write_dxf_polylines(path, layers):
+    """
+    Writes 2d polylines to a minimal R12 dxf file.
+    Only the x and y coordinates are written.
+
+    Args:
+        path (str): The file path
+        layers (list[(str, list[Polyline])]): The polylines, by layer name
+    """
+
+    lines = ["0", "SECTION", "2", "ENTITIES"]
+    for layer, plines in layers:
+        for pline in plines:
+            lines.extend(_dxf_polyline(layer, pline))
+    lines.extend(["0", "ENDSEC", "0", "EOF"])
+
+    with open(path, "w") as dxf_file:
+        dxf_file.write("\n".join(lines))
+        dxf_file.write("\n")
+
+
+def write_svg_polylines(path, layers):
+    """
+    Writes 2d polylines to a svg file, one group per layer.
+    Svg has it's y axis pointing down, so all points are mirrored.
+
+    Args:
+        path (str): The file path
+        layers (list[(str, list[Polyline])]): The polylines, by layer name
+    """
+
+    bbox = rg.BoundingBox.Empty
+    for _, plines in layers:
+        for pline in plines:
+            bbox.Union(pline.BoundingBox)
+
+    if not bbox.IsValid:
+        bbox = rg.BoundingBox(rg.Point3d.Origin, rg.Point3d.Origin)
+
+    lines = [
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="{} {} {} {}">'.format(
+            bbox.Min.X, -bbox.Max.Y, bbox.Max.X - bbox.Min.X, bbox.Max.Y - bbox.Min.Y
+        )
+    ]
+    for layer, plines in layers:
+        lines.append('<g id="{}" fill="none" stroke="black">'.format(layer))
+        for pline in plines:
+            points = " ".join("{},{}".format(point.X, -point.Y) for point in pline)
+            tag = "polygon" if pline.IsClosed else "polyline"
+            lines.append('<{} points="{}"/>'.format(tag, points))
+        lines.append("</g>")
+    lines.append("</svg>")
+
+    with open(path, "w") as svg_file:
+        svg_file.write("\n".join(lines))
+        svg_file.write("\n")
+
+
+def write_outlines(path, layers, file_format):
+    """
+    Writes the 2d outlines of a single fabrication part
+
+    Args:
+        path (str): The file path without extension
+        layers (list[(str, list[Polyline])]): The polylines, by layer name
+        file_format (str): One of `OUTLINE_FORMATS`
+
+    Returns:
+        str: The path of the written file
+    """
+
+    if file_format not in OUTLINE_FORMATS:
+        raise ValueError("Unknown outline format {}".format(file_format))
+
+    path = _file_path(path, file_format)
+
+    if file_format == "dxf":
+        write_dxf_polylines(path, layers)
+    else:
+        write_svg_polylines(path, layers)
+
+    return path
@@ -0,0 +1,153 @@
+import math
+import Rhino.Geometry as rg
+
+"""
+Module that exposes generators for synthetic facades of planar panels,
+used to benchmark the fabrication pipeline on arbitrary facade sizes.
+All generators return the panel outlines as closed polylines,
+neighboring panels share their edge vertices exactly.
+"""
+
+
+def _grid_size(count):
+    """
+    Calculates the columns and rows of a roughly square grid with at least count cells
+    """
+
+    columns = int(math.ceil(math.sqrt(count)))
+    rows = int(math.ceil(count / float(columns)))
+    return columns, rows
+
+
+def _closed(points):
+    pline = rg.Polyline(points)
+    pline.Add(points[0])
+    return pline
+
+
+def quad_facade(count, size=1000.0, fold=0.3):
+    """
+    Generates a facade of planar quads on a translational surface.
+    Every quad is a parallelogram, so it's planar, while the dihedral angles
+    between neighbors vary along both grid directions.
+
+    Args:
+        count (int): The number of panels
+        size (float, optional): The panel edge length in grid direction
+        fold (float, optional): The relative height of the folds, 0.0 is a flat facade
+
+    Returns:
+        list[Polyline]: The closed panel outlines
+    """
+
+    columns, rows = _grid_size(count)
+
+    def point(i, j):
+        z = size * fold * (math.sin(i * 0.9) + math.sin(j * 0.7))
+        return rg.Point3d(i * size, j * size, z)
+
+    outlines = []
+    for j in range(rows):
+        for i in range(columns):
+            if len(outlines) == count:
+                return outlines
+            outlines.append(
+                _closed(
+                    [point(i, j), point(i + 1, j), point(i + 1, j + 1), point(i, j + 1)]
+                )
+            )
+
+    return outlines
+
+
+def triangle_facade(count, size=1000.0, fold=0.3):
+    """
+    Generates a facade of triangles on a folded height field,
+    every grid cell is split into two triangles.
+
+    Args:
+        count (int): The number of panels
+        size (float, optional): The length of the triangle legs
+        fold (float, optional): The relative height of the folds, 0.0 is a flat facade
+
+    Returns:
+        list[Polyline]: The closed panel outlines
+    """
+
+    columns, rows = _grid_size(int(math.ceil(count / 2.0)))
+
+    def point(i, j):
+        z = size * fold * (math.sin(i * 0.9) + math.cos(j * 1.3))
+        return rg.Point3d(i * size, j * size, z)
+
+    outlines = []
+    for j in range(rows):
+        for i in range(columns):
+            for triangle in [
+                [point(i, j), point(i + 1, j), point(i + 1, j + 1)],
+                [point(i, j), point(i + 1, j + 1), point(i, j + 1)],
+            ]:
+                if len(outlines) == count:
+                    return outlines
+                outlines.append(_closed(triangle))
+
+    return outlines
+
+
+def hex_facade(count, size=1000.0, fold=0.3):
+    """
+    Generates a facade of planar hexagons on a paraboloid.
+    Every hexagon lies in the tangent plane at it's center, tangent planes
+    of three neighbors meet above the shared vertex, so all hexagons are planar.
+    The dihedral angles grow from the facade center outwards.
+
+    Args:
+        count (int): The number of panels
+        size (float, optional): The distance between opposite hexagon corners
+        fold (float, optional): The paraboloid slope at the facade border, 0.0 is a flat facade
+
+    Returns:
+        list[Polyline]: The closed panel outlines
+    """
+
+    columns, rows = _grid_size(count)
+    radius = size / 2.0
+    width = math.sqrt(3) * radius
+
+    centers = []
+    for j in range(rows):
+        for i in range(columns):
+            centers.append(
+                (
+                    (i + 0.5 * (j % 2) - columns / 2.0) * width,
+                    (j - rows / 2.0) * 1.5 * radius,
+                )
+            )
+    centers = centers[:count]
+
+    extent = max(math.hypot(x, y) for x, y in centers) + radius
+    curvature = fold / (2.0 * extent)
+
+    def point(x, y):
+        # the tangent plane at every center evaluates to the same height here
+        return rg.Point3d(x, y, curvature * (x * x + y * y - radius * radius))
+
+    outlines = []
+    for cx, cy in centers:
+        corners = []
+        for k in range(6):
+            angle = math.radians(30 + 60 * k)
+            corners.append(
+                point(cx + radius * math.cos(angle), cy + radius * math.sin(angle))
+            )
+        outlines.append(_closed(corners))
+
+    return outlines
+
+
+FACADES = {
+    "quad": quad_facade,
+    "triangle": triangle_facade,
+    "hex": hex_facade,
+}
+"""All facade generators, by name"""
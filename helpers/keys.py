@@ -1,4 +1,6 @@
 import string
+import hashlib
+from helpers.settings import GeometrySettings
 
 __EDGE_KEYS = [c for c in string.ascii_lowercase]
 __CORNER_KEYS = [c for c in string.ascii_uppercase]
@@ -23,8 +25,24 @@ def create_settings(
     dowel_radius=0.005,
     sawtooth_depth=0.015,
     sawtooth_width=0.04,
+    toolhead_radius=0.004,
 ):
-    return {}
+    """
+    Creates validated geometry settings
+
+    Returns:
+        GeometrySettings: The settings
+    """
+
+    return GeometrySettings(
+        beam_max_width,
+        beam_thickness,
+        plate_thickness,
+        dowel_radius,
+        sawtooth_depth,
+        sawtooth_width,
+        toolhead_radius,
+    )
 
 
 def corner_keys(count):
@@ -155,3 +173,71 @@ def panel_plate_identifier(panel_identifier):
 
 def panel_skeleton_identifier(panel_identifier):
     return "{}_S".format(panel_identifier)
+
+
+def cassette_panel_identifier(identifier):
+    """
+    Gets the panel identifier from the identifier of a cassette plate, skeleton or beam
+
+    Returns:
+        str: The panel identifier, or None if the identifier is no cassette part
+    """
+
+    panel_identifier, _, suffix = identifier.rpartition("_")
+    if not panel_identifier:
+        return
+
+    if suffix in ["P", "S"] or (len(suffix) > 2 and suffix[0] == "B"):
+        return panel_identifier
+
+
+def cylinder_key(parent_identifier, plane, radius, height):
+    """
+    Gets a key of the placement of a cylinder, rounded to a thousandth of a unit.
+    Cylinders within tolerance of each other can round to different keys,
+    so only use it for naming, compare cylinders with `CylinderBase.matches`.
+
+    Args:
+        parent_identifier (str): The identifier of the parent component
+        plane (Plane): The plane of the cylinder
+        radius (float): The radius of the cylinder
+        height (float): The height of the cylinder
+
+    Returns:
+        tuple: The key
+    """
+
+    # adding 0.0 turns a rounded -0.0 into 0.0
+    values = [
+        plane.Origin.X,
+        plane.Origin.Y,
+        plane.Origin.Z,
+        plane.ZAxis.X,
+        plane.ZAxis.Y,
+        plane.ZAxis.Z,
+        radius,
+        height,
+    ]
+    return (parent_identifier,) + tuple(round(value, 3) + 0.0 for value in values)
+
+
+def cylinder_identifier(type_name, parent_identifier, plane, radius, height):
+    """
+    Gets a stable identifier for a cylinder component, which is the same
+    every time a cylinder is created at the same spot.
+
+    Args:
+        type_name (str): The type name of the cylinder, e.g. 'Dowel'
+        parent_identifier (str): The identifier of the parent component
+        plane (Plane): The plane of the cylinder
+        radius (float): The radius of the cylinder
+        height (float): The height of the cylinder
+
+    Returns:
+        str: The identifier
+    """
+
+    key = cylinder_key(parent_identifier, plane, radius, height)
+    digest = hashlib.md5(repr(key).encode("utf-8")).hexdigest()[:8]
+
+    return "{}_{}_{}".format(parent_identifier, type_name, digest)
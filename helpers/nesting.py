@@ -0,0 +1,293 @@
+import math
+import Rhino.Geometry as rg
+
+"""
+Module that exposes a skyline nesting of flat parts onto stock sheets.
+Parts are packed by their rotated bounding rectangles, which keeps the packing fast
+for thousands of parts. Every part is inflated by the clearance on all sides,
+so two neighboring parts are at least two clearances apart.
+"""
+
+
+class NestingPart(object):
+    """
+    A flat part to nest, given by it's outlines in the world xy plane
+    """
+
+    def __init__(self, identifier, outlines):
+        """
+        Args:
+            identifier (str): The identifier of the part
+            outlines (list[Polyline]): The closed outlines, the first one is used for the area
+        """
+
+        self.identifier = identifier
+        self.outlines = outlines
+
+    @property
+    def area(self):
+        """
+        The area enclosed by the first outline
+        """
+        points = list(self.outlines[0])
+        area = 0.0
+        for a, b in zip(points, points[1:] + points[:1]):
+            area += a.X * b.Y - b.X * a.Y
+        return abs(area) / 2.0
+
+    def rotated_bounds(self, angle):
+        """
+        Calculates the bounding box of the part, rotated by the given angle around the origin
+        """
+        xform = rg.Transform.Rotation(angle, rg.Point3d.Origin)
+        bbox = rg.BoundingBox.Empty
+        for outline in self.outlines:
+            for point in outline:
+                point = rg.Point3d(point)
+                point.Transform(xform)
+                bbox.Union(point)
+        return bbox
+
+
+class Placement(object):
+    """
+    The location of a nested part on a sheet
+    """
+
+    def __init__(self, part, sheet_index, xform):
+        self.part = part
+        self.sheet_index = sheet_index
+        self.xform = xform
+        """The transformation from the part outlines to the sheet"""
+
+
+class Sheet(object):
+    """
+    A single stock sheet, packed with a skyline
+    """
+
+    def __init__(self, index, width, height):
+        self.index = index
+        self.width = width
+        self.height = height
+        self.placements = []
+        self.__skyline = [[0.0, 0.0, width]]
+        """Skyline segments of x, y and width, sorted by x"""
+        self.__failed = []
+        """Rectangle sizes that did not fit, the skyline only rises so they never will"""
+
+    def __fit(self, index, width, height):
+        """
+        Finds the lowest y a rectangle fits at, starting at the given skyline segment
+        """
+        x = self.__skyline[index][0]
+        if x + width > self.width:
+            return
+
+        y = 0.0
+        remaining = width
+        while remaining > 0:
+            if index >= len(self.__skyline):
+                return
+            y = max(y, self.__skyline[index][1])
+            if y + height > self.height:
+                return
+            remaining -= self.__skyline[index][2]
+            index += 1
+
+        return y
+
+    def find_position(self, width, height):
+        """
+        Finds the bottom left position for a rectangle
+
+        Returns:
+            (float, float, int): The x and y of the position, and the skyline segment index,
+            or None if the rectangle does not fit
+        """
+
+        for failed_width, failed_height in self.__failed:
+            if width >= failed_width and height >= failed_height:
+                return
+
+        best = None
+        for index, (x, _, _) in enumerate(self.__skyline):
+            y = self.__fit(index, width, height)
+            if y is None:
+                continue
+            if best is None or (y + height, x) < (best[1] + best[3], best[0]):
+                best = (x, y, index, height)
+
+        if best is None:
+            self.__failed = [
+                (failed_width, failed_height)
+                for failed_width, failed_height in self.__failed
+                if failed_width < width or failed_height < height
+            ]
+            self.__failed.append((width, height))
+            return
+        return best[:3]
+
+    def add_rectangle(self, index, x, y, width, height):
+        """
+        Raises the skyline under a placed rectangle
+        """
+
+        skyline = self.__skyline
+        skyline.insert(index, [x, y + height, width])
+
+        # shrink or remove the segments covered by the new one
+        i = index + 1
+        while i < len(skyline):
+            previous_end = skyline[i - 1][0] + skyline[i - 1][2]
+            if skyline[i][0] >= previous_end:
+                break
+            shrink = previous_end - skyline[i][0]
+            skyline[i][0] += shrink
+            skyline[i][2] -= shrink
+            if skyline[i][2] > 1e-9:
+                break
+            skyline.pop(i)
+
+        # merge neighboring segments of the same height
+        i = 0
+        while i < len(skyline) - 1:
+            if abs(skyline[i][1] - skyline[i + 1][1]) < 1e-9:
+                skyline[i][2] += skyline[i + 1][2]
+                skyline.pop(i + 1)
+            else:
+                i += 1
+
+    @property
+    def free_height(self):
+        """
+        The height above the lowest skyline segment, no higher rectangle fits the sheet
+        """
+        return self.height - min(segment[1] for segment in self.__skyline)
+
+    @property
+    def utilization(self):
+        """
+        The ratio of the part area to the sheet area
+        """
+        used = sum(placement.part.area for placement in self.placements)
+        return used / (self.width * self.height)
+
+
+def rotation_angles(steps):
+    """
+    Gets the rotation angles in radians for the given number of steps in a full turn
+    """
+    steps = max(1, steps)
+    return [2.0 * math.pi * i / steps for i in range(steps)]
+
+
+def nest(
+    parts, sheet_width, sheet_height, clearance=0.0, rotation_steps=4, open_sheets=10
+):
+    """
+    Nests the given parts onto as few sheets as possible, largest parts first.
+    Every part goes to the first open sheet it fits on, at the lowest position of all rotations.
+
+    Args:
+        parts (list[NestingPart]): The parts to nest
+        sheet_width (float): The width of a stock sheet
+        sheet_height (float): The height of a stock sheet
+        clearance (float, optional): The minimum distance from a part to it's bounding rectangle,
+        e.g. the toolhead radius
+        rotation_steps (int, optional): The number of rotations to try per full turn
+        open_sheets (int, optional): The number of most recent sheets parts are tried on,
+        older sheets are closed. Bounds the runtime for thousands of parts.
+
+    Returns:
+        (list[Sheet], list[NestingPart]): The packed sheets, and the parts that fit on no sheet
+    """
+
+    angles = rotation_angles(rotation_steps)
+
+    candidates = []
+    for part in parts:
+        rotations = []
+        for angle in angles:
+            bbox = part.rotated_bounds(angle)
+            width = bbox.Max.X - bbox.Min.X + 2.0 * clearance
+            height = bbox.Max.Y - bbox.Min.Y + 2.0 * clearance
+            rotations.append((angle, bbox, width, height))
+        size = min(max(width, height) for _, _, width, height in rotations)
+        min_height = min(height for _, _, _, height in rotations)
+        candidates.append((size, part, rotations, min_height))
+
+    candidates.sort(key=lambda x: x[0], reverse=True)
+
+    sheets = []
+    unplaced = []
+    for _, part, rotations, min_height in candidates:
+        best = None
+        for sheet in sheets[-open_sheets:] + [
+            Sheet(len(sheets), sheet_width, sheet_height)
+        ]:
+            # skip full sheets without scanning their skyline
+            if min_height > sheet.free_height:
+                continue
+
+            for angle, bbox, width, height in rotations:
+                position = sheet.find_position(width, height)
+                if position is None:
+                    continue
+                x, y, index = position
+                if best is None or (y + height, x) < best[0]:
+                    best = (
+                        (y + height, x),
+                        sheet,
+                        angle,
+                        bbox,
+                        width,
+                        height,
+                        position,
+                    )
+
+            # first fit, a new sheet is only opened if the part fits on no open one
+            if best is not None:
+                break
+
+        if best is None:
+            unplaced.append(part)
+            continue
+
+        _, sheet, angle, bbox, width, height, (x, y, index) = best
+        if sheet.index == len(sheets):
+            sheets.append(sheet)
+
+        sheet.add_rectangle(index, x, y, width, height)
+
+        translation = rg.Vector3d(
+            x + clearance - bbox.Min.X, y + clearance - bbox.Min.Y, 0.0
+        )
+        xform = rg.Transform.Translation(translation) * rg.Transform.Rotation(
+            angle, rg.Point3d.Origin
+        )
+        sheet.placements.append(Placement(part, sheet.index, xform))
+
+    return sheets, unplaced
+
+
+def format_report(title, sheets, unplaced=None):
+    """
+    Formats the utilization of the given sheets as a report string
+    """
+
+    lines = ["{}: {} sheet(s)".format(title, len(sheets))]
+    for sheet in sheets:
+        lines.append(
+            "  sheet {}: {} parts, {:.1%} utilization".format(
+                sheet.index, len(sheet.placements), sheet.utilization
+            )
+        )
+    if unplaced:
+        lines.append(
+            "  {} part(s) larger than a sheet: {}".format(
+                len(unplaced), ", ".join(part.identifier for part in unplaced)
+            )
+        )
+
+    return "\n".join(lines)
@@ -0,0 +1,186 @@
+from System import Action, Array, Environment, Func, TimeSpan
+from System.Collections.Concurrent import EnumerablePartitionerOptions, Partitioner
+from System.Collections.Generic import List
+from System.Threading import ThreadLocal
+from System.Threading.Tasks import Parallel, ParallelOptions, Task, TaskCreationOptions
+import time
+import traceback
+
+"""
+Module that wraps the .NET task parallel library, so pure geometry
+work can be spread over multiple cores from inside of Rhino.
+Jobs run here must never touch the rhino document!
+"""
+
+
+class JobResult(object):
+    """
+    The outcome of a single parallel job
+    """
+
+    def __init__(self, item, result=None, error=None, timed_out=False):
+        self.item = item
+        """The input item the job was run for"""
+        self.result = result
+        """The return value of the job, None if it failed"""
+        self.error = error
+        """A formatted error message, None if the job succeeded"""
+        self.timed_out = timed_out
+        """True if the job did not finish in time, it might still be running"""
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+
+def run(func, items, worker_state=None, max_workers=None, timeout=None):
+    """
+    Runs the given function for every item on the .NET thread pool.
+    Items are handed out one by one in the given order, so sorting them
+    by cost up front makes the expensive jobs start first.
+    Exceptions raised inside of jobs are caught and stored on the results,
+    so one failing job never aborts the others.
+
+    Args:
+        func (callable): The job function. Called as func(item), or as func(item, state)
+        if a worker_state factory is given.
+        items (iterable): The items to run the job function for
+        worker_state (callable, optional): A factory creating read-only state,
+        which is created once per worker thread, e.g. a geometry duplicate.
+        max_workers (int, optional): The maximum number of concurrent jobs.
+        Defaults to the number of cores.
+        timeout (float, optional): The time in seconds after which a job counts as failed.
+        Rhino geometry operations can not be cancelled, so a timed out job keeps
+        running in the background, but it's result is discarded.
+        Timed jobs run as long running tasks, which are awaited from the calling thread.
+
+    Returns:
+        list[JobResult]: The job results, in the same order as the items
+    """
+
+    items = list(items)
+
+    if timeout is not None:
+        return _run_timed(func, items, worker_state, max_workers, timeout)
+
+    results = [None] * len(items)
+
+    state = None
+    if worker_state is not None:
+        state = ThreadLocal[object](Func[object](worker_state))
+
+    def call(index):
+        item = items[index]
+        try:
+            if state is None:
+                return JobResult(item, func(item))
+            return JobResult(item, func(item, state.Value))
+        except Exception:
+            return JobResult(item, error=traceback.format_exc())
+
+    def body(index):
+        results[index] = call(index)
+
+    options = ParallelOptions()
+    if max_workers:
+        options.MaxDegreeOfParallelism = max_workers
+
+    # hand out items one at a time and in order, instead of in chunks
+    partitioner = Partitioner.Create[int](
+        List[int](range(len(items))), EnumerablePartitionerOptions.NoBuffering
+    )
+    Parallel.ForEach[int](partitioner, options, Action[int](body))
+
+    if state is not None:
+        state.Dispose()
+
+    return results
+
+
+def _run_timed(func, items, worker_state, max_workers, timeout):
+    """
+    Runs the jobs as long running tasks, at most max_workers at a time.
+    Only the calling thread waits, so no pool thread is blocked by a waiting job.
+    A timed out job keeps it's worker state, the next job gets a new one.
+    """
+
+    results = [None] * len(items)
+    max_workers = max_workers or Environment.ProcessorCount
+
+    free_states = []
+    running = []
+    """Tuples of task, item index, worker state and start time"""
+
+    def start(index):
+        if worker_state is None:
+            state = None
+        elif free_states:
+            state = free_states.pop()
+        else:
+            state = worker_state()
+
+        def call():
+            item = items[index]
+            try:
+                if worker_state is None:
+                    return JobResult(item, func(item))
+                return JobResult(item, func(item, state))
+            except Exception:
+                return JobResult(item, error=traceback.format_exc())
+
+        task = Task.Factory.StartNew[object](
+            Func[object](call), TaskCreationOptions.LongRunning
+        )
+        running.append((task, index, state, time.time()))
+
+    next_index = 0
+    while next_index < len(items) or running:
+        while next_index < len(items) and len(running) < max_workers:
+            start(next_index)
+            next_index += 1
+
+        # wake up when the first task finishes, or the earliest one times out
+        remaining = min(started + timeout for _, _, _, started in running) - time.time()
+        Task.WaitAny(
+            Array[Task]([task for task, _, _, _ in running]),
+            TimeSpan.FromSeconds(max(0.0, remaining)),
+        )
+
+        now = time.time()
+        for entry in list(running):
+            task, index, state, started = entry
+            if task.IsCompleted:
+                results[index] = task.Result
+                if state is not None:
+                    free_states.append(state)
+            elif now - started >= timeout:
+                results[index] = JobResult(
+                    items[index],
+                    error="Timed out after {}s".format(timeout),
+                    timed_out=True,
+                )
+            else:
+                continue
+
+            running.remove(entry)
+
+    return results
+
+
+def format_report(title, failures):
+    """
+    Formats a list of failures as a single report string
+
+    Args:
+        title (str): The report headline
+        failures (list[(str, str)]): Tuples of failing item name and error message
+
+    Returns:
+        str: The formatted report
+    """
+
+    lines = ["{}: {} failure(s)".format(title, len(failures))]
+    for name, message in failures:
+        lines.append("  {}: {}".format(name, message.strip()))
+
+    return "\n".join(lines)
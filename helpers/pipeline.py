@@ -0,0 +1,265 @@
+try:
+    import scriptcontext as sc
+except:
+    import inside_doc as sc
+import hashlib
+import logging
+from helpers import profiling
+
+"""
+Module that exposes an incremental rebuild graph over the fabrication stages.
+Every stage has one node per panel, the node fingerprint covers the panel data
+and the fingerprints of all nodes it depends on, so a change to a panel makes
+the panel nodes and all of their dependents stale.
+"""
+
+FINGERPRINT_SECTION = "P7_Pipeline"
+"""The document string section the node fingerprints are stored in"""
+
+
+class Stage(object):
+    """
+    A single stage of the fabrication pipeline
+    """
+
+    def __init__(
+        self,
+        name,
+        run,
+        depends_on=None,
+        neighbor_depends_on=None,
+        uses_neighbors=False,
+        clear=None,
+        settings=None,
+    ):
+        """
+        Initializes a new stage
+
+        Args:
+            name (str): The unique name of the stage
+            run (callable): Runs the stage for a list of panels
+            depends_on (list[str], optional): Stages this stage depends on for the same panel
+            neighbor_depends_on (list[str], optional): Stages this stage depends on for the neighbors
+            uses_neighbors (bool, optional): True if the stage reads neighbor panel data
+            clear (callable, optional): Removes all components created by an earlier run for a list of panels
+            settings (list[str], optional): The geometry settings the stage reads,
+            None if it reads all of them. Changes to other settings don't make the stage stale.
+        """
+
+        self.name = name
+        self.run = run
+        self.depends_on = depends_on or []
+        self.neighbor_depends_on = neighbor_depends_on or []
+        self.uses_neighbors = uses_neighbors or bool(self.neighbor_depends_on)
+        self.clear = clear
+        self.settings = None if settings is None else tuple(sorted(settings))
+
+
+def panel_fingerprint(panel, settings=None):
+    """
+    Calculates a fingerprint of all panel data the stages read:
+    outline, plane, settings and neighbor data
+
+    Args:
+        panel (Panel): The panel to fingerprint
+        settings (list[str], optional): The settings to cover, None covers all of them
+
+    Returns:
+        str: The fingerprint
+    """
+
+    def point(pt):
+        return tuple(round(value, 3) + 0.0 for value in [pt.X, pt.Y, pt.Z])
+
+    data = [
+        panel.identifier,
+        [point(corner) for corner in panel.outline.corners],
+        point(panel.plane.Origin),
+        point(panel.plane.ZAxis),
+        sorted(
+            (key, repr(value))
+            for key, value in panel.settings.items()
+            if settings is None or key in settings
+        ),
+        sorted((key, str(value)) for key, value in panel.neighbor_ids.items()),
+        sorted((key, round(value, 6)) for key, value in panel.neighbor_angles.items()),
+    ]
+
+    return _hash(data)
+
+
+def _hash(data):
+    return hashlib.md5(repr(data).encode("utf-8")).hexdigest()
+
+
+class RebuildGraph(object):
+    """
+    A dependency graph over the fabrication stages,
+    which only re-runs stages for panels whose inputs changed
+    """
+
+    def __init__(self, stages, doc=None):
+        """
+        Initializes a new graph
+
+        Args:
+            stages (list[Stage]): The stages, ordered so every stage comes after it's dependencies
+            doc (RhinoDoc, optional): The document the fingerprints are stored in
+        """
+
+        if doc is None:
+            doc = sc.doc
+
+        self.doc = doc
+        self.stages = stages
+
+        names = set()
+        for stage in stages:
+            for dependency in stage.depends_on + stage.neighbor_depends_on:
+                if dependency not in names:
+                    logging.warn(
+                        "Stage {} depends on {}, which does not run before it".format(
+                            stage.name, dependency
+                        )
+                    )
+            names.add(stage.name)
+
+    @staticmethod
+    def __node_key(stage_name, panel):
+        return "{}|{}".format(stage_name, panel.identifier)
+
+    def stored_fingerprint(self, stage_name, panel):
+        return self.doc.Strings.GetValue(
+            FINGERPRINT_SECTION, self.__node_key(stage_name, panel)
+        )
+
+    def __store_fingerprint(self, stage_name, panel, fingerprint):
+        self.doc.Strings.SetString(
+            FINGERPRINT_SECTION, self.__node_key(stage_name, panel), fingerprint
+        )
+
+    def fingerprints(self, panels):
+        """
+        Calculates the fingerprints of all nodes for the given panels.
+        Dependencies on stages that are not part of this graph are ignored.
+
+        Args:
+            panels (list[Panel]): All panels of the facade
+
+        Returns:
+            dict[(str, str): str]: The fingerprints, keyed by stage name and panel identifier
+        """
+
+        # stages reading the same settings share the panel fingerprints
+        panel_fingerprints = {}
+
+        def fingerprint(panel, stage):
+            key = (panel.identifier, stage.settings)
+            if key not in panel_fingerprints:
+                panel_fingerprints[key] = panel_fingerprint(panel, stage.settings)
+            return panel_fingerprints[key]
+
+        panels_by_id = {panel.panel_id: panel for panel in panels}
+
+        def neighbors(panel):
+            return [
+                panels_by_id[neighbor_id]
+                for neighbor_id in panel.get_existing_neighbor_ids()
+                if neighbor_id in panels_by_id
+            ]
+
+        fingerprints = {}
+        for stage in self.stages:
+            for panel in panels:
+                data = [stage.name, fingerprint(panel, stage)]
+
+                for dependency in stage.depends_on:
+                    data.append(fingerprints.get((dependency, panel.identifier)))
+
+                if stage.uses_neighbors:
+                    for neighbor in sorted(
+                        neighbors(panel), key=lambda x: x.identifier
+                    ):
+                        data.append(fingerprint(neighbor, stage))
+                        for dependency in stage.neighbor_depends_on:
+                            data.append(
+                                fingerprints.get((dependency, neighbor.identifier))
+                            )
+
+                fingerprints[(stage.name, panel.identifier)] = _hash(data)
+
+        return fingerprints
+
+    def stale_panels(self, panels, fingerprints=None):
+        """
+        Finds the panels every stage needs to be re-run for
+
+        Args:
+            panels (list[Panel]): All panels of the facade
+            fingerprints (dict, optional): Pre-calculated fingerprints, see `fingerprints`
+
+        Returns:
+            list[(Stage, list[Panel])]: The stages in run order, together with their stale panels
+        """
+
+        if fingerprints is None:
+            fingerprints = self.fingerprints(panels)
+
+        stale = []
+        for stage in self.stages:
+            stage_panels = [
+                panel
+                for panel in panels
+                if self.stored_fingerprint(stage.name, panel)
+                != fingerprints[(stage.name, panel.identifier)]
+            ]
+            stale.append((stage, stage_panels))
+
+        return stale
+
+    def rebuild(self, panels, force=False, only=None):
+        """
+        Re-runs all stale nodes and their dependents, stage by stage
+
+        Args:
+            panels (list[Panel]): All panels of the facade
+            force (bool, optional): Re-run every node, even if it's up to date
+            only (list[str], optional): Identifiers of the panels to re-run nodes for.
+            Fingerprints still cover all panels, so neighbor data stays consistent.
+
+        Returns:
+            dict[str: list[str]]: The identifiers of the rebuilt panels per stage
+        """
+
+        fingerprints = self.fingerprints(panels)
+
+        if force:
+            stale = [(stage, panels) for stage in self.stages]
+        else:
+            stale = self.stale_panels(panels, fingerprints)
+
+        if only is not None:
+            only = set(only)
+            stale = [
+                (stage, [panel for panel in stage_panels if panel.identifier in only])
+                for stage, stage_panels in stale
+            ]
+
+        rebuilt = {}
+        for stage, stage_panels in stale:
+            if not stage_panels:
+                continue
+
+            with profiling.stage(stage.name):
+                if stage.clear is not None:
+                    stage.clear(stage_panels)
+                stage.run(stage_panels)
+
+            for panel in stage_panels:
+                self.__store_fingerprint(
+                    stage.name, panel, fingerprints[(stage.name, panel.identifier)]
+                )
+
+            rebuilt[stage.name] = [panel.identifier for panel in stage_panels]
+
+        return rebuilt
@@ -0,0 +1,321 @@
+try:
+    import scriptcontext as sc
+except:
+    import inside_doc as sc
+import functools
+import json
+import logging
+import math
+import os
+import threading
+import timeit
+from System.Diagnostics import Process
+from System.Threading import Timer, TimerCallback
+
+"""
+Module that exposes a lightweight instrumentation layer for the fabrication stages.
+Operations are timed with `measure`, stages with `stage`, both work as decorators
+and as context managers. Measurements are aggregated per stage, category and name,
+e.g. ("beams", "deserialize", "Panel").
+Profiling is off by default, set the P7_PROFILE environment variable
+to a json path, or call `enable`, to switch it on.
+"""
+
+PROFILE_ENV_KEY = "P7_PROFILE"
+"""Environment variable holding the path the profile is dumped to"""
+
+NO_STAGE = "-"
+"""Stage name for measurements taken outside of any stage"""
+
+_LOCK = threading.Lock()
+
+_STATE = {"enabled": False, "path": None}
+
+_STAGE_STACK = []
+
+_STAGES = {}
+"""Stage totals, keyed by stage name"""
+
+_OPERATIONS = {}
+"""Measured durations and object counts, keyed by stage, category and name"""
+
+
+def enable(path=None):
+    """
+    Switches profiling on
+
+    Args:
+        path (str, optional): The json file the profile is dumped to,
+        every time the outermost stage finishes
+    """
+
+    _STATE["enabled"] = True
+    _STATE["path"] = path
+
+
+def disable():
+    _STATE["enabled"] = False
+    _STATE["path"] = None
+
+
+def is_enabled():
+    return _STATE["enabled"]
+
+
+def reset():
+    """
+    Forgets all measurements
+    """
+
+    with _LOCK:
+        _STAGES.clear()
+        _OPERATIONS.clear()
+
+
+def current_stage():
+    if not _STAGE_STACK:
+        return NO_STAGE
+    return _STAGE_STACK[-1]
+
+
+def record(category, name, seconds, objects=0):
+    """
+    Records a single measurement for the current stage
+
+    Args:
+        category (str): The kind of operation, e.g. "boolean"
+        name (str): The name of the operation, e.g. a component type
+        seconds (float): The wall time the operation took
+        objects (int, optional): The number of document objects the operation added
+    """
+
+    key = (current_stage(), category, name)
+    with _LOCK:
+        operation = _OPERATIONS.get(key)
+        if operation is None:
+            operation = {"durations": [], "objects": 0}
+            _OPERATIONS[key] = operation
+        operation["durations"].append(seconds)
+        operation["objects"] += objects
+
+
+def _object_count(doc):
+    if doc is None:
+        return 0
+    return doc.Objects.Count
+
+
+class _Timed(object):
+    """
+    Base of `measure` and `stage`, usable as decorator and as context manager
+    """
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _STATE["enabled"]:
+                return func(*args, **kwargs)
+
+            with self.for_function(func):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def for_function(self, func):
+        return self
+
+
+class measure(_Timed):
+    """
+    Measures an operation, e.g. a serialization or a boolean
+
+    Args:
+        category (str): The kind of operation
+        name (str, optional): The name of the operation, defaults to the decorated function name
+        doc (RhinoDoc, optional): Count the objects the operation adds to this document.
+        Never pass a document for operations running on worker threads.
+    """
+
+    def __init__(self, category, name=None, doc=None):
+        self.category = category
+        self.name = name
+        self.doc = doc
+        self.__active = False
+        """True if profiling was enabled when the block was entered"""
+
+    def for_function(self, func):
+        if self.name is not None:
+            return measure(self.category, self.name, self.doc)
+        return measure(self.category, func.__name__, self.doc)
+
+    def __enter__(self):
+        # profiling might be switched on or off inside of the block
+        self.__active = _STATE["enabled"]
+        if self.__active:
+            self.__objects = _object_count(self.doc)
+            self.__start = timeit.default_timer()
+        return self
+
+    def __exit__(self, *args):
+        if not self.__active:
+            return
+
+        record(
+            self.category,
+            self.name,
+            timeit.default_timer() - self.__start,
+            _object_count(self.doc) - self.__objects,
+        )
+
+
+class stage(_Timed):
+    """
+    Attributes all measurements taken inside of it to the named pipeline stage.
+    Re-entering a stage that is already running is transparent.
+
+    Args:
+        name (str): The name of the stage, e.g. "beams"
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.__active = False
+        """True if this stage was pushed to the stage stack when the block was entered"""
+
+    def for_function(self, func):
+        return stage(self.name)
+
+    def __enter__(self):
+        self.__active = _STATE["enabled"] and self.name not in _STAGE_STACK
+        if not self.__active:
+            return self
+
+        _STAGE_STACK.append(self.name)
+        self.__objects = _object_count(sc.doc)
+        self.__start = timeit.default_timer()
+        return self
+
+    def __exit__(self, *args):
+        if not self.__active:
+            return
+
+        seconds = timeit.default_timer() - self.__start
+        objects = _object_count(sc.doc) - self.__objects
+        _STAGE_STACK.pop()
+
+        with _LOCK:
+            totals = _STAGES.setdefault(
+                self.name, {"calls": 0, "seconds": 0.0, "objects": 0}
+            )
+            totals["calls"] += 1
+            totals["seconds"] += seconds
+            totals["objects"] += objects
+
+        if not _STAGE_STACK and _STATE["path"]:
+            dump(_STATE["path"])
+
+
+class MemorySampler(object):
+    """
+    Samples the working set of the rhino process on a background timer,
+    to find the memory peak while the wrapped block runs.
+    Works regardless of profiling being enabled.
+
+    Args:
+        interval (float, optional): The time in seconds between two samples
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        """The highest sampled working set in bytes"""
+        self.__process = Process.GetCurrentProcess()
+        self.__timer = None
+
+    def __sample(self, state=None):
+        self.__process.Refresh()
+        self.peak = max(self.peak, self.__process.WorkingSet64)
+
+    def __enter__(self):
+        self.peak = 0
+        self.__sample()
+        milliseconds = int(self.interval * 1000)
+        self.__timer = Timer(TimerCallback(self.__sample), None, 0, milliseconds)
+        return self
+
+    def __exit__(self, *args):
+        self.__timer.Dispose()
+        self.__timer = None
+        self.__sample()
+
+
+def _percentile(durations, percent):
+    ordered = sorted(durations)
+    index = int(math.ceil(percent / 100.0 * len(ordered))) - 1
+    return ordered[max(0, min(index, len(ordered) - 1))]
+
+
+def summary():
+    """
+    Aggregates all measurements
+
+    Returns:
+        dict: The stage totals, and the call count, total, mean and p95 wall time
+        and object count of every operation, most expensive operations first
+    """
+
+    with _LOCK:
+        stages = dict((name, dict(totals)) for name, totals in _STAGES.items())
+        operations = [
+            (key, list(operation["durations"]), operation["objects"])
+            for key, operation in _OPERATIONS.items()
+        ]
+
+    entries = []
+    for (stage_name, category, name), durations, objects in operations:
+        total = sum(durations)
+        entries.append(
+            {
+                "stage": stage_name,
+                "category": category,
+                "name": name,
+                "calls": len(durations),
+                "total": total,
+                "mean": total / len(durations),
+                "p95": _percentile(durations, 95),
+                "objects": objects,
+            }
+        )
+
+    entries.sort(key=lambda x: x["total"], reverse=True)
+
+    return {"stages": stages, "operations": entries}
+
+
+def dump(path=None):
+    """
+    Writes the profile summary to a json file
+
+    Args:
+        path (str, optional): The json file to write to,
+        defaults to the path given to `enable`
+
+    Returns:
+        dict: The written summary
+    """
+
+    if path is None:
+        path = _STATE["path"]
+    if path is None:
+        logging.error("No path to dump the profile to")
+        return
+
+    result = summary()
+    with open(path, "w") as profile_file:
+        json.dump(result, profile_file, indent=2, sort_keys=True)
+
+    return result
+
+
+if os.environ.get(PROFILE_ENV_KEY):
+    enable(os.environ[PROFILE_ENV_KEY])
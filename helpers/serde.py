@@ -8,6 +8,8 @@ except:
     import components.inside_doc as sc
 import System.Drawing as draw
 import helpers.keys as keys
+from helpers import profiling
+from helpers.settings import Mapping
 import math
 
 SEPERATOR = "_"
@@ -55,6 +57,7 @@ def add_or_find_layer(name, doc=None, color=None, parent=None):
     return doc.Layers.Add(layer)
 
 
+@profiling.measure("serde")
 def serialize_geometry_with_attrs(geo, attrs, doc=None):
     if doc is None:
         doc = sc.doc
@@ -65,6 +68,62 @@ def serialize_geometry_with_attrs(geo, attrs, doc=None):
     return doc.Objects.Add(geo, attrs)
 
 
+@profiling.measure("serde")
+def serialize_instance_with_attrs(definition_index, xform, attrs, doc=None):
+    """
+    Serialize an instance of the given instance definition to the rhino document.
+
+    Args:
+        definition_index (int): The index of the instance definition
+        xform (Transform): The transformation from definition to instance space
+        attrs (ObjectAttributes): The attributes of the instance object.
+        If an ObjectId is set, the old object will be replaced.
+        doc (RhinoDoc, optional): The document to serialize to.
+
+    Returns:
+        System.Guid: The id of the instance object in the rhino document
+    """
+    if doc is None:
+        doc = sc.doc
+
+    if attrs.ObjectId is not None:
+        doc.Objects.Delete(attrs.ObjectId, False)
+
+    return doc.Objects.AddInstanceObject(definition_index, xform, attrs)
+
+
+def add_or_find_instance_definition(name, create_geometry, layer_index, doc=None):
+    """
+    Adds or finds the instance definition with the given name and returns it's index.
+    The geometry is only created, if the definition does not exist yet.
+
+    Args:
+        name (str): The unique name of the definition
+        create_geometry (callable): Creates the definition geometry in world space
+        layer_index (int): The layer for the definition geometry
+        doc (RhinoDoc, optional): The document to search in
+
+    Returns:
+        int: The index of the definition, or -1 if it could not be created
+    """
+    if doc is None:
+        doc = sc.doc
+
+    definition = doc.InstanceDefinitions.Find(name)
+    if definition is not None:
+        return definition.Index
+
+    geo = create_geometry()
+    if geo is None:
+        return -1
+
+    attrs = Rhino.DocObjects.ObjectAttributes()
+    attrs.LayerIndex = layer_index
+
+    return doc.InstanceDefinitions.Add(name, "", rg.Point3d.Origin, geo, attrs)
+
+
+@profiling.measure("serde")
 def serialize_geometry(geo, layer_index, doc=None, name=None, old_id=None):
     """
     Serialize a given geometry to the given rhino document.
@@ -95,7 +154,7 @@ def serialize_geometry(geo, layer_index, doc=None, name=None, old_id=None):
 def serialize_pydict(py_dict):
     arch_dict = rc.ArchivableDictionary()
     for key, value in py_dict.items():
-        if isinstance(value, dict):
+        if isinstance(value, Mapping):
             arch_dict.Set(key, serialize_pydict(value))
         else:
             arch_dict.Set(key, value)
@@ -115,17 +174,84 @@ def deserialize_pydict(arch_dict):
     return py_dict
 
 
+@profiling.measure("serde")
 def add_named_group(doc, ids, name):
-    group = sc.doc.Groups.FindName(name)
+    if doc is None:
+        doc = sc.doc
+
+    group = doc.Groups.FindName(name)
     if group is None:
         # group with our identifier does not exist yet, add to table
-        return sc.doc.Groups.Add(name, ids)
+        return doc.Groups.Add(name, ids)
 
     else:
-        sc.doc.Groups.AddToGroup(group.Index, ids)
+        doc.Groups.AddToGroup(group.Index, ids)
         return group.Index
 
 
+def find_geometry(object_id, doc=None):
+    """
+    Finds the geometry of the object with the given id
+
+    Returns:
+        GeometryBase: The geometry, or None if no object has the id
+    """
+    if doc is None:
+        doc = sc.doc
+
+    obj = doc.Objects.FindId(object_id)
+    if obj is None:
+        return None
+    return obj.Geometry
+
+
+class GroupMembers(object):
+    """
+    The members of a component group, fetched from the document once,
+    and indexed by object name and object type.
+    Deserializers of parent and child classes share one instance.
+    """
+
+    def __init__(self, group_index, doc=None):
+        if doc is None:
+            doc = sc.doc
+
+        self.group_index = group_index
+        self.identifier = doc.Groups.GroupName(group_index)
+        """The group name, which is the component identifier"""
+        self.objects = list(doc.Groups.GroupMembers(group_index) or [])
+        self.__by_name = {}
+        self.__by_type = {}
+        for obj in self.objects:
+            self.__by_name.setdefault(obj.Name, obj)
+            self.__by_type.setdefault(obj.ObjectType, []).append(obj)
+
+    def __iter__(self):
+        return iter(self.objects)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def named(self, name):
+        """
+        Gets the first member with the given name, or None
+        """
+        return self.__by_name.get(name)
+
+    def of_type(self, object_type):
+        """
+        Gets all members of the given Rhino.DocObjects.ObjectType
+        """
+        return self.__by_type.get(object_type, [])
+
+    @property
+    def label(self):
+        """
+        The label object, which is named after the group
+        """
+        return self.named(self.identifier)
+
+
 def find_named_obj(objs, name):
     objs = [obj for obj in objs if obj.Name == name]
     if not objs:
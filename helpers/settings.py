@@ -1,9 +1,270 @@
-class GeometrySettings(object):
+try:
+    import scriptcontext as sc
+except:
+    import inside_doc as sc
+import hashlib
+import json
+import logging
+import numbers
+
+try:
+    from collections.abc import Mapping, MutableMapping
+except ImportError:
+    from collections import Mapping, MutableMapping
+
+PROFILE_SECTION = "P7_SettingsProfiles"
+"""The document string section the settings profiles are stored in, as json"""
+
+_PROFILE_CACHE = {}
+"""Parsed profiles, keyed by document serial number and profile id"""
+
+
+class SettingsMap(MutableMapping):
+    """
+    A copy on write view of a settings dictionary.
+    The base dictionary is shared and never changed, writes only go to this map.
+    Nested dictionaries are wrapped the same way when they are first read,
+    so a change only copies the part of the settings it touches.
+    """
+
+    def __init__(self, base=None, profile_id=None):
+        """
+        Args:
+            base (dict, optional): The settings to share, they are not copied
+            profile_id (str, optional): The id of the settings profile the base was read from
+        """
+
+        self.__base = base if base is not None else {}
+        self.profile_id = profile_id
+        self.__overrides = {}
+        """Changed and read nested values, by key"""
+        self.__deleted = set()
+        """Keys of the base deleted from this map"""
+
+    def __getitem__(self, key):
+        if key in self.__overrides:
+            return self.__overrides[key]
+        if key in self.__deleted:
+            raise KeyError(key)
+
+        value = self.__base[key]
+        if isinstance(value, Mapping):
+            # keep the wrapper, so writes to the nested settings are not lost
+            value = SettingsMap(value)
+            self.__overrides[key] = value
+
+        return value
+
+    def __setitem__(self, key, value):
+        self.__overrides[key] = value
+        self.__deleted.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+
+        self.__overrides.pop(key, None)
+        if key in self.__base:
+            self.__deleted.add(key)
+
+    def __contains__(self, key):
+        if key in self.__overrides:
+            return True
+        return key in self.__base and key not in self.__deleted
+
+    def __iter__(self):
+        for key in self.__base:
+            if key not in self.__deleted and key not in self.__overrides:
+                yield key
+        for key in self.__overrides:
+            yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return "SettingsMap({!r})".format(dict(self))
+
+    @property
+    def base(self):
+        """
+        The shared settings this map reads through to
+        """
+        return self.__base
+
+    @property
+    def has_deletions(self):
+        return bool(self.__deleted)
+
+    def changes(self):
+        """
+        Gets all values that differ from the base, as a plain dictionary.
+        Deleted keys are not part of it, see `has_deletions`.
+        """
+
+        changes = {}
+        for key, value in self.__overrides.items():
+            if isinstance(value, SettingsMap):
+                value = dict(value)
+            if key in self.__base and value == self.__base[key]:
+                continue
+            changes[key] = value
+
+        return changes
+
+
+def store_profile(settings, profile_id=None, doc=None):
+    """
+    Stores a settings profile once in the document, so components can reference it
+    instead of storing all settings themselves.
+    Storing an existing profile id again changes the settings of all components using it.
+
+    Args:
+        settings (dict): The settings, all values need to be json serializable
+        profile_id (str, optional): The profile name, defaults to a hash of the settings
+        doc (RhinoDoc, optional): The document to store the profile in
+
+    Returns:
+        str: The profile id
+    """
+
+    if doc is None:
+        doc = sc.doc
+
+    text = json.dumps(dict(settings), sort_keys=True)
+    if profile_id is None:
+        profile_id = hashlib.md5(text.encode("utf-8")).hexdigest()[:12]
+
+    doc.Strings.SetString(PROFILE_SECTION, profile_id, text)
+    _parse_profile(doc, profile_id, text)
+
+    return profile_id
+
+
+def _parse_profile(doc, profile_id, text):
+    """
+    Parses the profile into the cached dictionary, which is updated in place,
+    so every settings map sharing it sees the new values
+    """
+
+    cache_key = (doc.RuntimeSerialNumber, profile_id)
+    cached = _PROFILE_CACHE.get(cache_key)
+    if cached is None:
+        cached = (text, json.loads(text))
+    elif cached[0] != text:
+        cached[1].clear()
+        cached[1].update(json.loads(text))
+        cached = (text, cached[1])
+    _PROFILE_CACHE[cache_key] = cached
+
+    return cached[1]
+
+
+def read_profile(profile_id, doc=None):
+    """
+    Reads a settings profile. The returned dictionary is shared, never change it.
+
+    Returns:
+        dict: The settings, or None if there is no profile with the given id
+    """
+
+    if doc is None:
+        doc = sc.doc
+
+    text = doc.Strings.GetValue(PROFILE_SECTION, profile_id)
+    if text is None:
+        return
+
+    return _parse_profile(doc, profile_id, text)
+
+
+def profile_ids(doc=None):
+    """
+    Gets the ids of all settings profiles in the document
+    """
+
+    if doc is None:
+        doc = sc.doc
+
+    return list(doc.Strings.GetEntryNames(PROFILE_SECTION) or [])
+
+
+def profile_settings(profile_id, overrides=None, doc=None):
+    """
+    Creates the settings of a component, which reads through to the given profile
+
+    Args:
+        profile_id (str): The id of the profile
+        overrides (dict, optional): The sparse component values, which win over the profile
+        doc (RhinoDoc, optional): The document the profile is stored in
+
+    Returns:
+        SettingsMap: The settings
+    """
+
+    profile = read_profile(profile_id, doc)
+    if profile is None:
+        logging.error("Failed to find settings profile {}".format(profile_id))
+        return SettingsMap(dict(overrides or {}))
+
+    settings = SettingsMap(profile, profile_id)
+    settings.update(overrides or {})
+
+    return settings
+
+
+def serialize_settings(settings, doc=None):
+    """
+    Gets the settings to store on a component, and the profile they reference
+
+    Returns:
+        (str, dict): The profile id or None, and the sparse overrides or all settings
+    """
+
+    profile_id = getattr(settings, "profile_id", None)
+    if profile_id is None or settings.has_deletions:
+        return None, settings
+
+    # components copied to another document bring their profile along
+    if doc is not None and doc.Strings.GetValue(PROFILE_SECTION, profile_id) is None:
+        store_profile(settings.base, profile_id, doc)
+
+    return profile_id, settings.changes()
+
+
+def _field(index, doc):
+    return property(lambda self: self._values[index], doc=doc)
+
+
+class GeometrySettings(Mapping):
     """
     Full set of geometry settings, like width, heigh, radius of different building elements,
     used for geometry generation.
+    The settings are validated and frozen, so they are hashable and can key caches.
+    They also read like a dictionary, for code that still indexes settings by name.
     """
 
+    FIELDS = (
+        "beam_max_width",
+        "beam_thickness",
+        "plate_thickness",
+        "dowel_radius",
+        "sawtooth_depth",
+        "sawtooth_width",
+        "toolhead_radius",
+    )
+    """The names of all settings, in order"""
+
+    _INDICES = {name: index for index, name in enumerate(FIELDS)}
+
+    beam_max_width = _field(0, "The maximum width of a beam")
+    beam_thickness = _field(1, "The material thickness of the beams")
+    plate_thickness = _field(2, "The material thickness of the plates")
+    dowel_radius = _field(3, "The radius of the plate dowels")
+    sawtooth_depth = _field(4, "The depth of a single sawtooth")
+    sawtooth_width = _field(5, "The width of a single sawtooth")
+    toolhead_radius = _field(6, "The radius of the milling toolhead")
+
     def __init__(
         self,
         beam_max_width,
@@ -12,10 +273,124 @@ class GeometrySettings(object):
         dowel_radius,
         sawtooth_depth,
         sawtooth_width,
+        toolhead_radius,
     ):
-        self.beam_max_width = beam_max_width
-        self.beam_thickness = beam_thickness
-        self.plate_thickness = plate_thickness
-        self.dowel_radius = dowel_radius
-        self.sawtooth_depth = sawtooth_depth
-        self.sawtooth_width = sawtooth_width
+        """
+        Raises:
+            ValueError: If a setting is not a positive number
+        """
+
+        values = (
+            beam_max_width,
+            beam_thickness,
+            plate_thickness,
+            dowel_radius,
+            sawtooth_depth,
+            sawtooth_width,
+            toolhead_radius,
+        )
+        for name, value in zip(self.FIELDS, values):
+            if (
+                isinstance(value, bool)
+                or not isinstance(value, numbers.Real)
+                or not value > 0
+            ):
+                raise ValueError(
+                    "Geometry setting {} needs to be a positive number, got {!r}".format(
+                        name, value
+                    )
+                )
+
+        object.__setattr__(self, "_values", values)
+        object.__setattr__(self, "_hash", hash(values))
+
+    @classmethod
+    def from_mapping(cls, settings):
+        """
+        Creates geometry settings from a settings dictionary, other keys are ignored
+
+        Args:
+            settings (dict): The settings, or existing geometry settings which are returned as is
+
+        Returns:
+            GeometrySettings: The settings
+
+        Raises:
+            ValueError: If a setting is missing or invalid
+        """
+
+        if isinstance(settings, cls):
+            return settings
+
+        missing = [name for name in cls.FIELDS if name not in settings]
+        if missing:
+            raise ValueError("Missing geometry settings {}".format(", ".join(missing)))
+
+        return cls(*[settings[name] for name in cls.FIELDS])
+
+    def replace(self, **changes):
+        """
+        Creates a copy of the settings with the given values changed
+        """
+
+        unknown = [name for name in changes if name not in self._INDICES]
+        if unknown:
+            raise ValueError("Unknown geometry settings {}".format(", ".join(unknown)))
+
+        return GeometrySettings(
+            *[
+                changes.get(name, value)
+                for name, value in zip(self.FIELDS, self._values)
+            ]
+        )
+
+    def changed_fields(self, other):
+        """
+        Gets the names of all settings that differ from the other settings
+        """
+
+        other = GeometrySettings.from_mapping(other)
+        return [
+            name
+            for name, a, b in zip(self.FIELDS, self._values, other._values)
+            if a != b
+        ]
+
+    def to_dict(self):
+        return dict(zip(self.FIELDS, self._values))
+
+    def __getitem__(self, key):
+        if key not in self._INDICES:
+            raise KeyError(key)
+        return self._values[self._INDICES[key]]
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GeometrySettings are frozen, use replace instead")
+
+    def __delattr__(self, name):
+        raise AttributeError("GeometrySettings are frozen, use replace instead")
+
+    def __eq__(self, other):
+        if isinstance(other, GeometrySettings):
+            return self._values == other._values
+        return Mapping.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return "GeometrySettings({})".format(
+            ", ".join(
+                "{}={!r}".format(name, value)
+                for name, value in zip(self.FIELDS, self._values)
+            )
+        )